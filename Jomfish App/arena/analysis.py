@@ -0,0 +1,181 @@
+import os, re, sys, queue, argparse, collections, concurrent.futures
+import chess, chess.pgn, chess.engine
+from uci import UCIEngine
+from bench import goCommand
+from registry import getConfigPath, loadEngineConfigs
+
+CACHE_SIZE = 200000
+EVAL_CLIP = 1000
+MOVE_MARKS = [(300, chess.pgn.NAG_BLUNDER), (100, chess.pgn.NAG_MISTAKE), (50, chess.pgn.NAG_DUBIOUS_MOVE)]
+SEARCH_STATS = re.compile(r"\s*\b(?:(?:seldepth|nodes|nps) \d+|lowerbound|upperbound)\b")
+
+def fenKey(board):
+    return " ".join(board.fen().split()[:4])
+
+class AnalysisPool:
+    def __init__(self, config, jobs, go, timeout_ms=60000):
+        self.config = config
+        self.go = go
+        self.timeout_ms = timeout_ms
+        self.engines = queue.Queue()
+        for _ in range(jobs):
+            self.engines.put(self.spawn())
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+    def spawn(self):
+        engine = UCIEngine(self.config["command"], self.config.get("workingDirectory", ""), False, 0, 0)
+        if not engine.isRunning():
+            raise Exception(f"Engine {self.config['name']} could not be started.")
+        for cmd in self.config.get("initStrings", []):
+            engine.sendCommand(cmd)
+        engine.newGame()
+        return engine
+    def evaluate(self, fen):
+        engine = self.engines.get()
+        try:
+            if engine.failure():
+                engine.quit()
+                engine = self.spawn()
+            engine.sendCommand("position fen " + fen)
+            bestmove, _, _ = engine.waitForBestmove(self.timeout_ms, self.go, "off")
+            return engine.last_info, bestmove
+        finally:
+            if engine.failure():
+                engine.quit()
+            self.engines.put(engine)
+    def submit(self, fen):
+        return self.executor.submit(self.evaluate, fen)
+    def close(self):
+        self.executor.shutdown()
+        while not self.engines.empty():
+            self.engines.get().quit()
+
+class AnalysisCache:
+    def __init__(self, pool, size=CACHE_SIZE):
+        self.pool = pool
+        self.size = size
+        self.entries = collections.OrderedDict()
+        self.hits = 0
+    def lookup(self, board):
+        key = fenKey(board)
+        future = self.entries.get(key)
+        if future is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return future
+        future = self.pool.submit(board.fen())
+        self.entries[key] = future
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+        return future
+
+def positionScore(board, outcome, result):
+    if outcome:
+        score = chess.engine.MateGiven if outcome.winner is not None else chess.engine.Cp(0)
+        return chess.engine.PovScore(score, not board.turn if outcome.winner is not None else board.turn), None, None
+    info, bestmove = result.result()
+    if info is None or not info.hasScore():
+        return None, None, bestmove
+    score = chess.engine.Cp(info.cp) if info.cp is not None else chess.engine.Mate(info.mate)
+    return chess.engine.PovScore(score, board.turn), info.depth, bestmove
+
+def positionEntry(board, cache):
+    outcome = board.outcome()
+    return board.copy(stack=False), outcome, None if outcome else cache.lookup(board)
+
+def submitGame(game, cache):
+    board = game.board()
+    positions = [positionEntry(board, cache)]
+    for move in game.mainline_moves():
+        board.push(move)
+        positions.append(positionEntry(board, cache))
+    return game, positions
+
+def clipped(score, color):
+    return max(-EVAL_CLIP, min(EVAL_CLIP, score.pov(color).score(mate_score=EVAL_CLIP * 10)))
+
+def clearSearchStats(node):
+    node.set_emt(None)
+    node.set_eval(None)
+    node.comment = SEARCH_STATS.sub("", node.comment).strip()
+
+def annotateGame(game, positions, engine_name):
+    game.headers["Annotator"] = engine_name
+    before, _, best = positionScore(*positions[0])
+    previous = positions[0][0]
+    for node, position in zip(game.mainline(), positions[1:]):
+        after, depth, next_best = positionScore(*position)
+        clearSearchStats(node)
+        if after is not None:
+            node.set_eval(after, depth)
+        if before is not None and after is not None:
+            mover = not position[0].turn
+            loss = clipped(before, mover) - clipped(after, mover)
+            mark = next((nag for threshold, nag in MOVE_MARKS if loss >= threshold), None)
+            if mark:
+                node.nags.add(mark)
+                if best and best != node.move.uci() and mark != chess.pgn.NAG_DUBIOUS_MOVE:
+                    try:
+                        move = chess.Move.from_uci(best)
+                    except ValueError:
+                        move = None
+                    if move in previous.legal_moves and not node.parent.has_variation(move):
+                        node.parent.add_variation(move)
+        before, best, previous = after, next_best, position[0]
+    return game
+
+def analyzeStream(source, output, pool, cache, engine_name, window, progress=None):
+    pending = collections.deque()
+    count = 0
+    def finish():
+        nonlocal count
+        game, positions = pending.popleft()
+        output.write(str(annotateGame(game, positions, engine_name)) + "\n\n")
+        output.flush()
+        count += 1
+        if progress:
+            progress(f"Game {count}: {len(positions) - 1} plies analyzed, {cache.hits} cache hits so far")
+    while True:
+        game = chess.pgn.read_game(source)
+        if game is None:
+            break
+        pending.append(submitGame(game, cache))
+        while len(pending) >= window:
+            finish()
+    while pending:
+        finish()
+    return count
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description="Annotate every game of a PGN file with engine evaluations and blunder marks.")
+    parser.add_argument("input", help="PGN file to analyze")
+    parser.add_argument("--output", help="annotated PGN (default: <input>-analyzed.pgn)")
+    parser.add_argument("--config", default=getConfigPath(), help="engine list (config.json)")
+    parser.add_argument("--engine", help="engine name (default: first configured engine)")
+    parser.add_argument("--depth", type=int, default=12, help="fixed search depth per position")
+    parser.add_argument("--nodes", type=int, help="fixed node count per position (overrides --depth)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="number of engine instances")
+    parser.add_argument("--cache", type=int, default=CACHE_SIZE, help="positions kept in the evaluation cache")
+    parser.add_argument("--timeout", type=int, default=60000, help="timeout per position in milliseconds")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    engines = loadEngineConfigs(args.config)
+    config = next((e for e in engines if e.get("name") == args.engine), None) if args.engine else (engines[0] if engines else None)
+    if not config:
+        print("No engine selected!", file=sys.stderr)
+        return 1
+    output_path = args.output or os.path.splitext(args.input)[0] + "-analyzed.pgn"
+    jobs = max(1, args.jobs)
+    pool = AnalysisPool(config, jobs, goCommand(args.depth, args.nodes), args.timeout)
+    try:
+        with open(args.input, "r", encoding="utf-8-sig", errors="replace") as source, open(output_path, "w", encoding="utf-8") as output:
+            count = analyzeStream(source, output, pool, AnalysisCache(pool, args.cache), config["name"], 2 * jobs,
+                                  lambda text: print(text, file=sys.stderr, flush=True))
+    finally:
+        pool.close()
+    print(f"{count} games written to {output_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
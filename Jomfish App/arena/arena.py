@@ -1,155 +1,34 @@
 import os
-import sys, json, time, itertools, re, concurrent.futures
+import sys, queue, shutil, concurrent.futures
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, 
                              QFormLayout, QLabel, QLineEdit, QPushButton, QTextEdit, QComboBox, QFileDialog, 
                              QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QListWidget, QListWidgetItem, 
-                             QAbstractItemView, QSpinBox, QInputDialog, QGroupBox)
-from PyQt5.QtCore import QProcess, QThread, pyqtSignal, Qt
+                             QAbstractItemView, QSpinBox, QInputDialog, QGroupBox, QCheckBox, QPlainTextEdit, QTableView)
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal, Qt, QAbstractTableModel, QModelIndex
 import chess, chess.pgn
+from uci import UCIEngine, EnginePool
+from sprt import SPRT, runPairedMatch
+from openings import OpeningBook
+from pgnindex import PGNIndex, INDEX_FIELDS
+from telemetry import Telemetry
+from scheduler import ResourceScheduler, runScheduled
+from formats import FORMATS, makeFormat
+from bench import BENCH_POSITIONS, loadPositions, goCommand, runBench, formatReport, loadBaseline, saveBaseline, baselinePath
+from registry import engineRegistry, ensureConfigDir
+from resultsdb import ResultStore
+from tournament import (outputDir, defaultOutputPath, addResult, formatSummary, EngineFailure, failedGame,
+                        simulate_game, TimeControl, GameFileWriter, gameHeaders, scheduleParams, TournamentJournal, Adjudication,
+                        CAPTURE_LEVELS, captureDir, capturePath)
 
-def getConfigPath():
-    return os.path.join(os.getenv("APPDATA"), "Jomfish", "config.json")
-
-def ensureConfigDir():
-    path_engine = getConfigPath()
-    d = os.path.dirname(path_engine)
-    os.makedirs(d, exist_ok=True)
-    if not os.path.exists(path_engine):
-        fixed_engine_path = os.path.join(os.getcwd(), "jomfish_none.exe")
-        engine_list = [{"name": "Jomfish 10", "command": fixed_engine_path, "protocol": "uci", 
-                        "workingDirectory": os.path.dirname(fixed_engine_path), "initStrings": []}]
-        with open(path_engine, "w") as f:
-            json.dump(engine_list, f, indent=4)
-    return path_engine
-
-class UCIEngineParser:
-    def __init__(self, command, working_dir=""):
-        self.command = command
-        self.working_dir = working_dir
-        self.process = QProcess()
-        if working_dir:
-            self.process.setWorkingDirectory(working_dir)
-        self.options = []
-        self.buffer = ""
-    def load_options(self, timeout=5000):
-        self.process.start(self.command)
-        if not self.process.waitForStarted(timeout):
-            raise Exception("Engine could not be started.")
-        self.sendCommand("uci")
-        start_time = time.time()
-        while True:
-            if self.process.waitForReadyRead(100):
-                data = self.process.readAllStandardOutput().data().decode()
-                self.buffer += data
-                for line in self.buffer.splitlines():
-                    if line.startswith("option"):
-                        self.parse_option_line(line)
-                    if line.strip() == "uciok":
-                        self.process.kill()
-                        return self.options
-            if (time.time()-start_time)*1000 > timeout:
-                self.process.kill()
-                break
-        return self.options
-    def sendCommand(self, cmd):
-        self.process.write((cmd+"\n").encode())
-    def parse_option_line(self, line):
-        pattern = r"option name (?P<name>.+?) type (?P<type>\S+)( default (?P<default>\S+))?( min (?P<min>\S+))?( max (?P<max>\S+))?"
-        m = re.search(pattern, line)
-        if m:
-            opt = {"name": m.group("name").strip(), "type": m.group("type").strip(),
-                   "default": m.group("default") if m.group("default") is not None else "",
-                   "min": m.group("min") if m.group("min") is not None else "",
-                   "max": m.group("max") if m.group("max") is not None else "",
-                   "value": m.group("default") if m.group("default") is not None else ""}
-            if not any(o["name"] == opt["name"] for o in self.options):
-                self.options.append(opt)
-
-class UCIEngine:
-    def __init__(self, command, working_dir="", use_wtime=False, time_left=1000, inc=0, color=chess.WHITE):
-        self.command = command
-        self.working_dir = working_dir
-        self.use_wtime = use_wtime
-        self.time_left = time_left
-        self.inc = inc
-        self.color = color
-        self.process = QProcess()
-        if working_dir:
-            self.process.setWorkingDirectory(working_dir)
-        self.buffer = ""
-        self.startEngine()
-    def startEngine(self):
-        self.process.start(self.command)
-        self.sendCommand("uci")
-        self.sendCommand("isready")
-    def sendCommand(self, cmd):
-        if self.process.state() == QProcess.Running:
-            self.process.write((cmd+"\n").encode())
-    def waitForBestmove(self, max_time_ms):
-        if self.use_wtime:
-            if self.color == chess.WHITE:
-                self.sendCommand(f"go wtime {int(self.time_left*1000)} winc {int(self.inc*1000)}")
-            else:
-                self.sendCommand(f"go btime {int(self.time_left*1000)} binc {int(self.inc*1000)}")
-        else:
-            self.sendCommand(f"go movetime {max_time_ms}")
-        buffer = ""
-        timeout = time.time() + (max_time_ms/1000.0 + 2)
-        bestmove = None
-        info_details = None
-        while time.time() < timeout:
-            if self.process.waitForReadyRead(100):
-                data = self.process.readAllStandardOutput().data().decode()
-                buffer += data
-                m = re.search(r"bestmove\s+(\S+)", buffer)
-                if m:
-                    bestmove = m.group(1)
-                    info_dict = {}
-                    for line in buffer.splitlines():
-                        if line.startswith("info"):
-                            tokens = line.split()
-                            i = 0
-                            while i < len(tokens):
-                                if tokens[i] == "depth" and i+1 < len(tokens):
-                                    info_dict["Depth"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "seldepth" and i+1 < len(tokens):
-                                    info_dict["Seldepth"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "multipv" and i+1 < len(tokens):
-                                    info_dict["MultiPV"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "score" and i+2 < len(tokens):
-                                    info_dict["Score"] = tokens[i+2] + " " + tokens[i+1]
-                                    i += 3
-                                elif tokens[i] == "nodes" and i+1 < len(tokens):
-                                    info_dict["Nodes"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "nps" and i+1 < len(tokens):
-                                    info_dict["NPS"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "tbhits" and i+1 < len(tokens):
-                                    info_dict["TBHits"] = tokens[i+1]
-                                    i += 2
-                                elif tokens[i] == "time" and i+1 < len(tokens):
-                                    info_dict["Time"] = tokens[i+1] + "ms"
-                                    i += 2
-                                else:
-                                    i += 1
-                    order = ["Depth", "Seldepth", "MultiPV", "Score", "Nodes", "NPS", "TBHits", "Time"]
-                    parts = [f"{key}: {info_dict[key]}" for key in order if key in info_dict]
-                    info_details = " | ".join(parts)
-                    break
-        return bestmove, info_details, buffer
-    def quit(self):
-        self.sendCommand("quit")
-        self.process.terminate()
-        self.process.waitForFinished(3000)
+LOG_LINES = 5000
+LOG_REFRESH_MS = 250
+STANDINGS_COLUMNS = ["#", "Engine", "Games", "Points", "Score", "W", "D", "L", "Elo"]
 
 class EngineConfigTab(QWidget):
     def __init__(self):
         super().__init__()
         self.options = []
+        self.options_command = None
         self.initUI()
     def initUI(self):
         layout = QVBoxLayout()
@@ -203,19 +82,24 @@ class EngineConfigTab(QWidget):
         if path:
             self.commandEdit.setText(path)
             self.workingDirEdit.setText(os.path.dirname(path))
+            self.clearOptions()
     def loadUCIOptions(self):
         cmd = self.commandEdit.text().strip()
         if not cmd:
             QMessageBox.warning(self, "Error", "Please select an engine first!")
             return
         working_dir = self.workingDirEdit.text().strip()
-        parser = UCIEngineParser(cmd, working_dir)
         try:
-            self.options = parser.load_options()
+            self.options = engineRegistry().options(cmd, working_dir, refresh=self.options_command == (cmd, working_dir))
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Error loading options: {str(e)}")
             return
+        self.options_command = (cmd, working_dir)
         self.populateOptionsTable()
+    def clearOptions(self):
+        self.options = []
+        self.options_command = None
+        self.optionsTable.setRowCount(0)
     def populateOptionsTable(self):
         self.optionsTable.setRowCount(0)
         for opt in self.options:
@@ -224,9 +108,9 @@ class EngineConfigTab(QWidget):
             self.optionsTable.setItem(row, 0, QTableWidgetItem(opt["name"]))
             self.optionsTable.setItem(row, 1, QTableWidgetItem(opt["type"]))
             self.optionsTable.setItem(row, 2, QTableWidgetItem(opt["default"]))
-            minmax = f"{opt['min']}/{opt['max']}" if opt["min"] and opt["max"] else ""
+            minmax = f"{opt['min']}/{opt['max']}" if opt["min"] and opt["max"] else " | ".join(opt.get("var", []))
             self.optionsTable.setItem(row, 3, QTableWidgetItem(minmax))
-            self.optionsTable.setItem(row, 4, QTableWidgetItem(opt["default"]))
+            self.optionsTable.setItem(row, 4, QTableWidgetItem(opt.get("value", opt["default"])))
     def getInitStrings(self):
         init_strings = []
         for row in range(self.optionsTable.rowCount()):
@@ -239,37 +123,51 @@ class EngineConfigTab(QWidget):
         if not self.engineNameEdit.text() or not self.commandEdit.text():
             QMessageBox.warning(self, "Error", "Please specify both engine name and command!")
             return
+        known = {opt["name"]: opt for opt in self.options}
+        options = []
+        for row in range(self.optionsTable.rowCount()):
+            name = self.optionsTable.item(row, 0).text()
+            option = known.get(name) or {"name": name, "type": self.optionsTable.item(row, 1).text(), "default": self.optionsTable.item(row, 2).text(),
+                                         "min": "", "max": "", "var": []}
+            options.append(dict(option, value=self.optionsTable.item(row, 4).text().strip()))
         engine = {"name": self.engineNameEdit.text(), "command": self.commandEdit.text(), 
                   "protocol": self.protocolCombo.currentText(), "workingDirectory": self.workingDirEdit.text(), 
-                  "initStrings": self.getInitStrings()}
-        path = ensureConfigDir()
-        engines = []
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    engines = json.load(f)
-            except Exception:
-                engines = []
-        engines = [e for e in engines if e.get("name") != engine["name"]]
-        engines.append(engine)
-        with open(path, "w") as f:
-            json.dump(engines, f, indent=4)
-        QMessageBox.information(self, "Success", f"Engine '{engine['name']}' has been configured and saved!")
-    def loadSavedEngine(self):
-        path = ensureConfigDir()
-        if not os.path.exists(path):
-            QMessageBox.information(self, "Info", "No saved engines found.")
+                  "initStrings": self.getInitStrings(), "options": options}
+        try:
+            engineRegistry().save(engine)
+        except ValueError:
+            engineRegistry().write([engine])
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Error saving engine: {str(e)}")
             return
+        QMessageBox.information(self, "Success", f"Engine '{engine['name']}' has been configured and saved!")
+    def savedEngines(self):
         try:
-            with open(path, "r") as f:
-                engines = json.load(f)
+            engineRegistry().ensure()
+            engines = engineRegistry().engines()
         except Exception:
             QMessageBox.warning(self, "Error", "Error loading saved engines.")
-            return
-        items = [e["name"] for e in engines]
-        if not items:
+            return None
+        if not engines:
             QMessageBox.information(self, "Info", "No saved engines found.")
+            return None
+        return engines
+    def savedOptions(self, e):
+        options = e.get("options") or engineRegistry().cachedOptions(e["command"], e.get("workingDirectory", "")) or []
+        options = {opt["name"]: opt for opt in options}
+        for init in e.get("initStrings", []):
+            parts = init.split(" value ", 1)
+            if len(parts) == 2:
+                opt_name = parts[0].replace("setoption name ", "").strip()
+                if opt_name not in options:
+                    options[opt_name] = {"name": opt_name, "type": "", "default": "", "min": "", "max": "", "var": []}
+                options[opt_name]["value"] = parts[1].strip()
+        return list(options.values())
+    def loadSavedEngine(self):
+        engines = self.savedEngines()
+        if not engines:
             return
+        items = [e["name"] for e in engines]
         item, ok = QInputDialog.getItem(self, "Load Saved Engine", "Select Engine:", items, 0, False)
         if ok and item:
             for e in engines:
@@ -278,160 +176,199 @@ class EngineConfigTab(QWidget):
                     self.commandEdit.setText(e["command"])
                     self.protocolCombo.setCurrentText(e["protocol"])
                     self.workingDirEdit.setText(e["workingDirectory"])
-                    self.optionsTable.setRowCount(0)
-                    if "initStrings" in e and e["initStrings"]:
-                        for init in e["initStrings"]:
-                            parts = init.split(" value ")
-                            if len(parts) == 2:
-                                opt_name = parts[0].replace("setoption name ", "").strip()
-                                opt_value = parts[1].strip()
-                                row = self.optionsTable.rowCount()
-                                self.optionsTable.insertRow(row)
-                                self.optionsTable.setItem(row, 0, QTableWidgetItem(opt_name))
-                                self.optionsTable.setItem(row, 1, QTableWidgetItem(""))
-                                self.optionsTable.setItem(row, 2, QTableWidgetItem(""))
-                                self.optionsTable.setItem(row, 3, QTableWidgetItem(""))
-                                self.optionsTable.setItem(row, 4, QTableWidgetItem(opt_value))
+                    self.options = self.savedOptions(e)
+                    self.options_command = None
+                    self.populateOptionsTable()
                     return
     def removeEngine(self):
-        path = ensureConfigDir()
-        if not os.path.exists(path):
-            QMessageBox.information(self, "Info", "No saved engines found.")
-            return
-        try:
-            with open(path, "r") as f:
-                engines = json.load(f)
-        except Exception:
-            QMessageBox.warning(self, "Error", "Error loading saved engines.")
+        engines = self.savedEngines()
+        if not engines:
             return
         items = [e["name"] for e in engines]
-        if not items:
-            QMessageBox.information(self, "Info", "No saved engines found.")
-            return
         item, ok = QInputDialog.getItem(self, "Remove Engine", "Select Engine to remove:", items, 0, False)
         if ok and item:
-            engines = [e for e in engines if e["name"] != item]
-            with open(path, "w") as f:
-                json.dump(engines, f, indent=4)
+            try:
+                engineRegistry().remove(item)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Error removing engine: {str(e)}")
+                return
             QMessageBox.information(self, "Success", f"Engine '{item}' has been removed!")
             self.engineNameEdit.clear()
             self.commandEdit.clear()
             self.workingDirEdit.clear()
-            self.optionsTable.setRowCount(0)
+            self.clearOptions()
 
 class TournamentThread(QThread):
     tournamentLog = pyqtSignal(str)
-    tournamentBoard = pyqtSignal(str)
+    tournamentBoard = pyqtSignal(str, str, str)
+    tournamentGameOver = pyqtSignal(str)
     tournamentEngineInfoWhite = pyqtSignal(str)
     tournamentEngineInfoBlack = pyqtSignal(str)
     tournamentEngineRaw = pyqtSignal(str)
     tournamentPGN = pyqtSignal(str)
     tournamentFinished = pyqtSignal(str)
-    def __init__(self, engines, movetime, rounds, concurrency, use_movetime=True):
+    tournamentStandings = pyqtSignal(list)
+    def __init__(self, engines, movetime, rounds, concurrency, use_movetime=True, time_control=None, pgn_path="", resume=True,
+                 sprt=None, max_pairs=0, adjudication=None, book=None, capture="info", scheduler=None, schedule="roundrobin"):
         super().__init__()
         self.engines = engines
         self.movetime = movetime
         self.rounds = rounds
         self.concurrency = concurrency
         self.use_movetime = use_movetime
+        self.time_control = time_control
+        self.pgn_path = pgn_path or defaultOutputPath()
+        self.resume = resume
+        self.sprt = sprt
+        self.max_pairs = max_pairs
+        self.adjudication = adjudication
+        self.book = book
+        self.capture = capture
+        self.scheduler = scheduler
+        self.schedule = schedule
+    def gameCapturePath(self, game_number):
+        return capturePath(captureDir(self.pgn_path), game_number) if self.capture == "full" else None
     def run(self):
-        overall_log = ""
+        tc = TimeControl(movetime=self.movetime) if self.use_movetime else self.time_control
+        if self.sprt:
+            self.runMatch(tc, "Arena SPRT Match")
+        else:
+            self.runRoundRobin(tc, "Arena Tournament")
+    def runRoundRobin(self, tc, event):
         results = {}
-        pgn_games = []
-        games = []
-        for _ in range(self.rounds):
-            pairs = list(itertools.combinations(self.engines, 2))
-            for pair in pairs:
-                games.append((pair[0], pair[1]))
-                games.append((pair[1], pair[0]))
-        total_games = len(games)
+        games = makeFormat(self.schedule, self.engines, self.rounds, self.book)
+        total_games = games.total()
+        params = scheduleParams(self.engines, self.rounds, tc, event, self.book, self.schedule)
+        journal = TournamentJournal.open(outputDir(), params, total_games, self.pgn_path, self.resume)
+        games.completed = journal.completed
+        self.pgn_path = journal.output_path
+        for record in journal.completed.values():
+            addResult(results, record["white"], record["black"], record["result"])
+        if journal.resumed():
+            self.tournamentLog.emit(f"Resuming tournament: {len(journal.completed)}/{total_games} games already played.\n\n")
+        pgn_writer = GameFileWriter(self.pgn_path, append=journal.resumed())
+        log_writer = GameFileWriter(os.path.splitext(self.pgn_path)[0] + ".log", append=journal.resumed())
+        telemetry = Telemetry(os.path.splitext(self.pgn_path)[0], append=journal.resumed())
+        store = ResultStore()
+        tournament_id = store.tournament(params, journal.resumed())
+        if journal.resumed():
+            store.restore(tournament_id, journal.completed)
+            self.tournamentStandings.emit(store.standings([tournament_id]))
+        self.tournamentPGN.emit(self.pgn_path)
+        self.pool = EnginePool(self.concurrency)
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
-            future_to_game = {executor.submit(self.simulate_game, white, black): (white, black) for white, black in games}
-            game_index = 0
-            for future in concurrent.futures.as_completed(future_to_game):
-                white, black = future_to_game[future]
-                try:
-                    game_log, result, pgn_text = future.result()
-                except Exception:
-                    game_log, result, pgn_text = "Error during simulation.", "Abort", ""
-                game_index += 1
-                overall_log += f"Game {game_index}/{total_games}: {white['name']} (White) vs. {black['name']} (Black)\n"
-                overall_log += game_log + "\nResult: " + result + "\n\n"
-                pgn_games.append(pgn_text)
-                results.setdefault(white['name'], 0)
-                results.setdefault(black['name'], 0)
-                if result=="1-0":
-                    results[white['name']] += 1
-                elif result=="0-1":
-                    results[black['name']] += 1
+            def submit(game, cores):
+                game_id, white, black, round_number, opening = game
+                return executor.submit(simulate_game, self.pool, white, black, tc, self, gameHeaders(event, round_number, tc), self.adjudication, opening,
+                                       self.capture, self.gameCapturePath(game_id+1), cores)
+            game_index = len(journal.completed)
+            def finished(game, future):
+                nonlocal game_index
+                game_id, white, black = game[:3]
+                error = future.exception()
+                if error:
+                    outcome = failedGame(error, games.retry(game))
+                    if outcome is None:
+                        if isinstance(error, EngineFailure):
+                            telemetry.add(None, error.metrics)
+                        self.tournamentLog.emit(f"{white['name']} (White) vs. {black['name']} (Black): {error}; restarting and replaying the game.\n\n")
+                        return None
                 else:
-                    results[white['name']] += 0.5
-                    results[black['name']] += 0.5
-                self.tournamentLog.emit(overall_log)
-        summary = "Tournament finished. Results:\n"
-        for name, score in results.items():
-            summary += f"{name}: {score} points\n"
-        pgn_combined = "\n\n".join(pgn_games)
-        self.tournamentPGN.emit(pgn_combined)
-        self.tournamentFinished.emit(summary)
-    def simulate_game(self, white_config, black_config):
-        board = chess.Board()
-        game = chess.pgn.Game()
-        game.headers["White"] = white_config["name"]
-        game.headers["Black"] = black_config["name"]
-        node = game
-        game_log = ""
-        move_count = 0
-        white_engine = UCIEngine(white_config["command"], white_config.get("workingDirectory", ""), False, 0, 0, color=chess.WHITE)
-        black_engine = UCIEngine(black_config["command"], black_config.get("workingDirectory", ""), False, 0, 0, color=chess.BLACK)
-        for cmd in white_config.get("initStrings", []):
-            white_engine.sendCommand(cmd)
-        for cmd in black_config.get("initStrings", []):
-            black_engine.sendCommand(cmd)
-        time.sleep(1)
-        while not board.is_game_over() and move_count < 200:
-            current_color = board.turn
-            current_engine = white_engine if current_color==chess.WHITE else black_engine
-            available_time_ms = int(self.movetime * 1000)
-            current_engine.sendCommand("position fen " + board.fen())
-            bestmove, info_details, raw_output = current_engine.waitForBestmove(available_time_ms)
-            prefix = "White" if current_color==chess.WHITE else "Black"
-            self.tournamentEngineRaw.emit(f"{prefix} raw: {raw_output}")
-            if not bestmove:
-                game_log += "No answer from engine.\n"
-                result = "Abort"
-                break
-            try:
-                move = chess.Move.from_uci(bestmove)
-            except Exception:
-                game_log += f"Invalid move: {bestmove}\n"
-                result = "Abort"
-                break
-            if move not in board.legal_moves:
-                game_log += f"Illegal move: {bestmove}\n"
-                result = "Abort"
-                break
-            board.push(move)
-            node = node.add_variation(move)
-            move_count += 1
-            board_state = board.unicode(borders=True)
-            white_debug = f"White {white_config['name']}: {info_details if info_details else 'idle'}"
-            black_debug = f"Black {black_config['name']}: {info_details if info_details else 'idle'}"
-            self.tournamentEngineInfoWhite.emit(white_debug)
-            self.tournamentEngineInfoBlack.emit(black_debug)
-            self.tournamentBoard.emit(f"{board_state}\nActive: {'White' if board.turn==chess.WHITE else 'Black'} - {white_config['name'] if board.turn==chess.BLACK else black_config['name']}")
-            game_log += f"{move_count}. {'White' if board.turn==chess.BLACK else 'Black'} plays {move.uci()} (movetime {self.movetime}s)\n"
-        result = board.result() if board.is_game_over() else "Abort"
-        white_engine.quit()
-        black_engine.quit()
-        pgn_text = str(game)
-        return game_log, result, pgn_text
+                    outcome = future.result()
+                game_log, result, pgn_text, metrics = outcome
+                if pgn_text:
+                    pgn_writer.write(pgn_text)
+                if not error or isinstance(error, EngineFailure):
+                    journal.record(game_id, white['name'], black['name'], result)
+                    if store.add(tournament_id, game_id+1, game[3], white, black, tc, game[4], result, pgn_text, metrics):
+                        self.tournamentStandings.emit(store.standings([tournament_id]))
+                game_index += 1
+                entry = f"Game {game_index}/{total_games}: {white['name']} (White) vs. {black['name']} (Black)\n"
+                entry += game_log + "\nResult: " + result + "\n\n"
+                log_writer.write(entry)
+                telemetry.add(game_index, metrics)
+                addResult(results, white['name'], black['name'], result)
+                self.tournamentLog.emit(entry)
+                return result
+            runScheduled(games, submit, finished, self.concurrency, self.scheduler)
+        self.pool.close()
+        pgn_writer.close()
+        log_writer.close()
+        self.tournamentStandings.emit(store.standings([tournament_id]))
+        store.close()
+        if len(journal.completed) == total_games:
+            journal.finish()
+        else:
+            journal.close()
+        telemetry.export()
+        self.tournamentFinished.emit(formatSummary(results) + telemetry.format())
+    def runMatch(self, tc, event):
+        results = {}
+        game_index = 0
+        submitted = 0
+        pgn_writer = GameFileWriter(self.pgn_path)
+        log_writer = GameFileWriter(os.path.splitext(self.pgn_path)[0] + ".log")
+        telemetry = Telemetry(os.path.splitext(self.pgn_path)[0])
+        store = ResultStore()
+        tournament_id = store.tournament(scheduleParams(self.engines, self.max_pairs, tc, event, self.book, "sprt"))
+        self.tournamentPGN.emit(self.pgn_path)
+        self.pool = EnginePool(self.concurrency)
+        def finished(white, black, outcome, round_number, opening):
+            nonlocal game_index
+            game_log, result, pgn_text, metrics = outcome
+            game_index += 1
+            entry = f"Game {game_index}: {white['name']} (White) vs. {black['name']} (Black)\n"
+            entry += game_log + "\nResult: " + result + "\n\n"
+            if pgn_text:
+                pgn_writer.write(pgn_text)
+            log_writer.write(entry)
+            telemetry.add(game_index, metrics)
+            if store.add(tournament_id, game_index, round_number, white, black, tc, opening, result, pgn_text, metrics):
+                self.tournamentStandings.emit(store.standings([tournament_id]))
+            addResult(results, white['name'], black['name'], result)
+            self.tournamentLog.emit(entry + self.sprt.status() + "\n\n")
+        def replayed(white, black, error):
+            if isinstance(error, EngineFailure):
+                telemetry.add(None, error.metrics)
+            self.tournamentLog.emit(f"{white['name']} (White) vs. {black['name']} (Black): {error}; restarting and replaying the game.\n\n")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            def submit(white, black, round_number, opening, cores):
+                nonlocal submitted
+                submitted += 1
+                return executor.submit(simulate_game, self.pool, white, black, tc, self, gameHeaders(event, round_number, tc), self.adjudication, opening,
+                                       self.capture, self.gameCapturePath(submitted), cores)
+            runPairedMatch(submit, self.engines[0], self.engines[1], self.sprt, self.max_pairs, self.concurrency, finished, self.book, self.scheduler,
+                           replayed)
+        self.pool.close()
+        pgn_writer.close()
+        log_writer.close()
+        self.tournamentStandings.emit(store.standings([tournament_id]))
+        store.close()
+        telemetry.export()
+        self.tournamentFinished.emit(formatSummary(results) + telemetry.format() + self.sprt.status() + "\n")
+    def engineRaw(self, text):
+        self.tournamentEngineRaw.emit(text)
+    def engineInfo(self, white_text, black_text):
+        self.tournamentEngineInfoWhite.emit(white_text)
+        self.tournamentEngineInfoBlack.emit(black_text)
+    def boardUpdate(self, key, fen, last_move):
+        self.tournamentBoard.emit(key, fen, last_move)
+    def gameOver(self, key):
+        self.tournamentGameOver.emit(key)
 
 class TournamentTab(QWidget):
     def __init__(self):
         super().__init__()
         self.engines = []
         self.thread = None
+        self.pendingLog = []
+        self.pendingRaw = []
+        self.liveGames = {}
+        self.pendingWhite = None
+        self.pendingBlack = None
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(LOG_REFRESH_MS)
+        self.refreshTimer.timeout.connect(self.flushUpdates)
         self.initUI()
         self.loadEngineList()
     def initUI(self):
@@ -446,20 +383,30 @@ class TournamentTab(QWidget):
         top_layout.addWidget(self.refreshButton)
         main_layout.addLayout(top_layout)
         debug_layout = QHBoxLayout()
-        self.tournamentLog = QTextEdit()
+        self.tournamentLog = QPlainTextEdit()
         self.tournamentLog.setReadOnly(True)
-        self.engineRawDebug = QTextEdit()
+        self.tournamentLog.setMaximumBlockCount(LOG_LINES)
+        self.engineRawDebug = QPlainTextEdit()
         self.engineRawDebug.setReadOnly(True)
+        self.engineRawDebug.setMaximumBlockCount(LOG_LINES)
         debug_layout.addWidget(QLabel("Tournament Log:"))
         debug_layout.addWidget(QLabel("Engine Raw Debug:"))
         logs_layout = QHBoxLayout()
         logs_layout.addWidget(self.tournamentLog)
         logs_layout.addWidget(self.engineRawDebug)
         main_layout.addLayout(logs_layout)
-        self.boardArea = QTextEdit()
-        self.boardArea.setReadOnly(True)
-        main_layout.addWidget(QLabel("Board (ASCII, Live):"))
-        main_layout.addWidget(self.boardArea)
+        self.standingsTable = QTableWidget(0, len(STANDINGS_COLUMNS))
+        self.standingsTable.setHorizontalHeaderLabels(STANDINGS_COLUMNS)
+        self.standingsTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.standingsTable.verticalHeader().setVisible(False)
+        self.standingsTable.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.standingsTable.setMaximumHeight(160)
+        main_layout.addWidget(QLabel("Standings (Live):"))
+        main_layout.addWidget(self.standingsTable)
+        self.boardTabs = QTabWidget()
+        self.boardTabs.currentChanged.connect(self.boardTabChanged)
+        main_layout.addWidget(QLabel("Running Games (ASCII, Live):"))
+        main_layout.addWidget(self.boardTabs)
         hlayout_debug = QHBoxLayout()
         self.debugWhite = QLineEdit()
         self.debugWhite.setReadOnly(True)
@@ -472,16 +419,104 @@ class TournamentTab(QWidget):
         main_layout.addWidget(QLabel("Summarized Engine Debug:"))
         main_layout.addLayout(hlayout_debug)
         tc_layout = QFormLayout()
+        self.tcModeCombo = QComboBox()
+        self.tcModeCombo.addItems(["Time per move", "Clock (base + increment)"])
         self.movetimeEdit = QLineEdit("1")
+        self.baseTimeEdit = QLineEdit("60")
+        self.incrementEdit = QLineEdit("0.6")
+        self.movesToGoSpin = QSpinBox()
+        self.movesToGoSpin.setRange(0, 200)
+        self.marginSpin = QSpinBox()
+        self.marginSpin.setRange(0, 10000)
+        self.marginSpin.setValue(50)
         self.roundsSpin = QSpinBox()
         self.roundsSpin.setMinimum(1)
         self.roundsSpin.setValue(1)
         self.concurrencySpin = QSpinBox()
         self.concurrencySpin.setMinimum(1)
         self.concurrencySpin.setValue(1)
+        tc_layout.addRow("Time control:", self.tcModeCombo)
         tc_layout.addRow("Time per move (s):", self.movetimeEdit)
-        tc_layout.addRow("Rounds (Round Robin):", self.roundsSpin)
+        tc_layout.addRow("Base time (s):", self.baseTimeEdit)
+        tc_layout.addRow("Increment (s):", self.incrementEdit)
+        tc_layout.addRow("Moves to go (0 = sudden death):", self.movesToGoSpin)
+        tc_layout.addRow("Time forfeit margin (ms):", self.marginSpin)
+        self.formatCombo = QComboBox()
+        self.formatCombo.addItems(["Round Robin", "Gauntlet (first listed engine vs. the rest)", "Swiss", "SPRT Match (2 engines)"])
+        self.sprtBoundsEdit = QLineEdit("0, 5")
+        self.sprtErrorsEdit = QLineEdit("0.05, 0.05")
+        self.maxPairsSpin = QSpinBox()
+        self.maxPairsSpin.setRange(1, 1000000)
+        self.maxPairsSpin.setValue(20000)
+        tc_layout.addRow("Format:", self.formatCombo)
+        tc_layout.addRow("Rounds:", self.roundsSpin)
+        tc_layout.addRow("SPRT Elo bounds (elo0, elo1):", self.sprtBoundsEdit)
+        tc_layout.addRow("SPRT alpha, beta:", self.sprtErrorsEdit)
+        tc_layout.addRow("SPRT max. game pairs:", self.maxPairsSpin)
         tc_layout.addRow("Concurrency:", self.concurrencySpin)
+        scheduling_layout = QHBoxLayout()
+        self.scheduleCheck = QCheckBox("Admit games by engine Threads/Hash")
+        self.scheduleCheck.setChecked(True)
+        self.coresSpin = QSpinBox()
+        self.coresSpin.setRange(0, 1024)
+        self.coresSpin.setSpecialValueText("All")
+        self.pinCheck = QCheckBox("Pin engines to cores (Linux)")
+        scheduling_layout.addWidget(self.scheduleCheck)
+        scheduling_layout.addWidget(QLabel("Cores:"))
+        scheduling_layout.addWidget(self.coresSpin)
+        scheduling_layout.addWidget(self.pinCheck)
+        tc_layout.addRow("CPU scheduling:", scheduling_layout)
+        adjudication_layout = QHBoxLayout()
+        self.resignMovesSpin = QSpinBox()
+        self.resignMovesSpin.setRange(0, 100)
+        self.resignScoreSpin = QSpinBox()
+        self.resignScoreSpin.setRange(100, 100000)
+        self.resignScoreSpin.setValue(600)
+        self.drawAfterSpin = QSpinBox()
+        self.drawAfterSpin.setRange(0, 500)
+        self.drawAfterSpin.setValue(40)
+        self.drawMovesSpin = QSpinBox()
+        self.drawMovesSpin.setRange(0, 100)
+        self.drawScoreSpin = QSpinBox()
+        self.drawScoreSpin.setRange(0, 1000)
+        self.drawScoreSpin.setValue(10)
+        adjudication_layout.addWidget(QLabel("Resign moves (0 = off):"))
+        adjudication_layout.addWidget(self.resignMovesSpin)
+        adjudication_layout.addWidget(QLabel("score (cp):"))
+        adjudication_layout.addWidget(self.resignScoreSpin)
+        adjudication_layout.addWidget(QLabel("Draw after move:"))
+        adjudication_layout.addWidget(self.drawAfterSpin)
+        adjudication_layout.addWidget(QLabel("moves (0 = off):"))
+        adjudication_layout.addWidget(self.drawMovesSpin)
+        adjudication_layout.addWidget(QLabel("score (cp):"))
+        adjudication_layout.addWidget(self.drawScoreSpin)
+        tc_layout.addRow("Adjudication:", adjudication_layout)
+        h_openings = QHBoxLayout()
+        self.openingsEdit = QLineEdit()
+        self.openingsEdit.setPlaceholderText("None (start position)")
+        self.openingsOrderCombo = QComboBox()
+        self.openingsOrderCombo.addItems(["Sequential", "Random"])
+        self.browseOpeningsButton = QPushButton("Browse")
+        self.browseOpeningsButton.clicked.connect(self.browseOpenings)
+        h_openings.addWidget(self.openingsEdit)
+        h_openings.addWidget(self.openingsOrderCombo)
+        h_openings.addWidget(self.browseOpeningsButton)
+        tc_layout.addRow("Opening suite (EPD/PGN):", h_openings)
+        h_output = QHBoxLayout()
+        self.pgnOutputEdit = QLineEdit()
+        self.pgnOutputEdit.setPlaceholderText("Automatic (Jomfish/tournaments)")
+        self.browseOutputButton = QPushButton("Browse")
+        self.browseOutputButton.clicked.connect(self.browseOutput)
+        h_output.addWidget(self.pgnOutputEdit)
+        h_output.addWidget(self.browseOutputButton)
+        tc_layout.addRow("PGN output file:", h_output)
+        self.captureCombo = QComboBox()
+        self.captureCombo.addItems(["Off", "Bestmove only", "Last info line", "Full (compressed file per game)"])
+        self.captureCombo.setCurrentIndex(2)
+        tc_layout.addRow("Engine output:", self.captureCombo)
+        self.resumeCheck = QCheckBox("Resume an interrupted tournament with the same settings")
+        self.resumeCheck.setChecked(True)
+        tc_layout.addRow("", self.resumeCheck)
         main_layout.addLayout(tc_layout)
         self.startTournamentButton = QPushButton("Start Tournament")
         self.startTournamentButton.clicked.connect(self.startTournament)
@@ -494,23 +529,20 @@ class TournamentTab(QWidget):
             QWidget { font-family: 'Segoe UI'; font-size: 11pt; }
             QPushButton { background-color: #008CBA; color: white; border-radius: 4px; padding: 6px 10px; }
             QPushButton:hover { background-color: #00A0DC; }
-            QLineEdit, QComboBox, QTextEdit, QTableWidget, QListWidget { background-color: #FFF; border: 1px solid #DDD; border-radius: 4px; padding: 4px; }
+            QLineEdit, QComboBox, QTextEdit, QPlainTextEdit, QTableWidget, QListWidget { background-color: #FFF; border: 1px solid #DDD; border-radius: 4px; padding: 4px; }
             QLabel { color: #333; }
             QGroupBox { font-weight: bold; border: 1px solid #AAA; border-radius: 4px; margin-top: 10px; }
             QGroupBox::title { subcontrol-origin: margin; left: 10px; padding: 0 3px; }
         """)
     def loadEngineList(self):
-        path = getConfigPath()
         self.engines = []
         self.engineListWidget.clear()
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    self.engines = json.load(f)
-            except Exception:
-                QMessageBox.warning(self, "Error", "Error loading engines.json")
-        else:
+        try:
+            self.engines = engineRegistry().engines()
+        except FileNotFoundError:
             QMessageBox.information(self, "Info", "No engines.json found.")
+        except Exception:
+            QMessageBox.warning(self, "Error", "Error loading engines.json")
         for engine in self.engines:
             item = QListWidgetItem(engine.get("name", "Unknown"))
             self.engineListWidget.addItem(item)
@@ -522,51 +554,348 @@ class TournamentTab(QWidget):
         selected_engines = [e for e in self.engines if e.get("name") in [item.text() for item in selected_items]]
         try:
             movetime = float(self.movetimeEdit.text().strip())
+            time_control = TimeControl(base=float(self.baseTimeEdit.text().strip()), inc=float(self.incrementEdit.text().strip()),
+                                       moves=self.movesToGoSpin.value(), margin_ms=self.marginSpin.value())
             rounds = self.roundsSpin.value()
             concurrency = self.concurrencySpin.value()
+            elo0, elo1 = [float(x) for x in self.sprtBoundsEdit.text().split(",")]
+            alpha, beta = [float(x) for x in self.sprtErrorsEdit.text().split(",")]
         except ValueError:
             QMessageBox.warning(self, "Error", "Invalid time-control values!")
             return
+        sprt = None
+        if self.formatCombo.currentIndex() == len(FORMATS):
+            if len(selected_engines) != 2:
+                QMessageBox.warning(self, "Error", "An SPRT match needs exactly two engines!")
+                return
+            sprt = SPRT(elo0, elo1, alpha, beta)
+        book = None
+        openings_path = self.openingsEdit.text().strip()
+        if openings_path:
+            try:
+                book = OpeningBook(openings_path, self.openingsOrderCombo.currentText().lower())
+            except (OSError, ValueError):
+                QMessageBox.warning(self, "Error", "Could not open the opening suite!")
+                return
+        use_movetime = self.tcModeCombo.currentIndex() == 0
         self.tournamentLog.clear()
         self.engineRawDebug.clear()
-        self.thread = TournamentThread(selected_engines, movetime, rounds, concurrency, use_movetime=True)
+        self.pendingLog, self.pendingRaw = [], []
+        self.boardTabs.clear()
+        self.liveGames = {}
+        self.standingsTable.setRowCount(0)
+        self.thread = TournamentThread(selected_engines, movetime, rounds, concurrency, use_movetime=use_movetime, time_control=time_control,
+                                       pgn_path=self.pgnOutputEdit.text().strip(), resume=self.resumeCheck.isChecked(),
+                                       sprt=sprt, max_pairs=self.maxPairsSpin.value(),
+                                       adjudication=Adjudication(self.resignMovesSpin.value(), self.resignScoreSpin.value(), self.drawAfterSpin.value(),
+                                                                 self.drawMovesSpin.value(), self.drawScoreSpin.value()),
+                                       book=book, capture=CAPTURE_LEVELS[self.captureCombo.currentIndex()],
+                                       scheduler=ResourceScheduler(self.coresSpin.value(), pin=self.pinCheck.isChecked()) if self.scheduleCheck.isChecked() else None,
+                                       schedule=FORMATS[min(self.formatCombo.currentIndex(), len(FORMATS) - 1)])
         self.thread.tournamentLog.connect(self.appendTournamentLog)
         self.thread.tournamentBoard.connect(self.updateBoard)
+        self.thread.tournamentGameOver.connect(self.removeBoard)
         self.thread.tournamentEngineInfoWhite.connect(self.updateSummarizedWhite)
         self.thread.tournamentEngineInfoBlack.connect(self.updateSummarizedBlack)
         self.thread.tournamentEngineRaw.connect(self.appendEngineRaw)
         self.thread.tournamentPGN.connect(self.saveTournamentPGN)
         self.thread.tournamentFinished.connect(self.appendTournamentLog)
+        self.thread.tournamentStandings.connect(self.updateStandings)
+        self.thread.finished.connect(self.tournamentDone)
+        self.refreshTimer.start()
         self.thread.start()
     def appendTournamentLog(self, text):
-        self.tournamentLog.setPlainText(text)
-        self.tournamentLog.verticalScrollBar().setValue(self.tournamentLog.verticalScrollBar().maximum())
+        self.pendingLog.append(text)
     def appendEngineRaw(self, text):
-        self.engineRawDebug.append(text)
-        self.engineRawDebug.verticalScrollBar().setValue(self.engineRawDebug.verticalScrollBar().maximum())
-    def updateBoard(self, board_text):
-        self.boardArea.setPlainText(board_text)
+        self.pendingRaw.append(text)
+        if len(self.pendingRaw) > LOG_LINES:
+            del self.pendingRaw[:-LOG_LINES]
+    def updateBoard(self, key, fen, last_move):
+        live = self.liveGames.get(key)
+        if live is None:
+            view = QPlainTextEdit()
+            view.setReadOnly(True)
+            live = self.liveGames[key] = [view, fen, last_move, True]
+            self.boardTabs.addTab(view, key)
+        else:
+            live[1:] = [fen, last_move, True]
+    def removeBoard(self, key):
+        live = self.liveGames.pop(key, None)
+        if live:
+            self.boardTabs.removeTab(self.boardTabs.indexOf(live[0]))
+            live[0].deleteLater()
+    def boardTabChanged(self, index):
+        self.renderBoard()
+    def renderBoard(self):
+        if not self.boardTabs.isVisible():
+            return
+        for live in self.liveGames.values():
+            view, fen, last_move, dirty = live
+            if dirty and view is self.boardTabs.currentWidget():
+                board = chess.Board(fen)
+                view.setPlainText(f"{board.unicode(borders=True)}\nLast move: {last_move or '-'} | Active: {'White' if board.turn==chess.WHITE else 'Black'}")
+                live[3] = False
+    def updateStandings(self, rows):
+        self.standingsTable.setRowCount(len(rows))
+        for index, row in enumerate(rows):
+            score = 100 * row["points"] / row["games"] if row["games"] else 0.0
+            values = [str(index + 1), row["engine"], str(row["games"]), f"{row['points']:g}", f"{score:.1f}%",
+                      str(row["wins"]), str(row["draws"]), str(row["losses"]), f"{row['elo']:+.1f}"]
+            for column, value in enumerate(values):
+                self.standingsTable.setItem(index, column, QTableWidgetItem(value))
     def updateSummarizedWhite(self, text):
-        self.debugWhite.setText(text)
+        self.pendingWhite = text
     def updateSummarizedBlack(self, text):
-        self.debugBlack.setText(text)
-    def saveTournamentPGN(self, pgn_text):
-        self.tournamentPGN = pgn_text
+        self.pendingBlack = text
+    def flushUpdates(self):
+        if self.pendingLog:
+            self.appendLines(self.tournamentLog, "".join(self.pendingLog).rstrip("\n") + "\n")
+            self.pendingLog = []
+        if self.pendingRaw:
+            self.appendLines(self.engineRawDebug, "\n".join(self.pendingRaw))
+            self.pendingRaw = []
+        self.renderBoard()
+        if self.pendingWhite is not None:
+            self.debugWhite.setText(self.pendingWhite)
+            self.pendingWhite = None
+        if self.pendingBlack is not None:
+            self.debugBlack.setText(self.pendingBlack)
+            self.pendingBlack = None
+    def appendLines(self, view, text):
+        view.appendPlainText(text)
+        view.verticalScrollBar().setValue(view.verticalScrollBar().maximum())
+    def tournamentDone(self):
+        self.refreshTimer.stop()
+        self.flushUpdates()
+    def browseOutput(self):
+        path, _ = QFileDialog.getSaveFileName(self, "PGN Output File", "", "PGN Files (*.pgn)")
+        if path:
+            self.pgnOutputEdit.setText(path)
+    def browseOpenings(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Opening Suite", "", "Opening Files (*.epd *.pgn);;All Files (*)")
+        if path:
+            self.openingsEdit.setText(path)
+    def saveTournamentPGN(self, pgn_path):
+        self.tournamentPGN = pgn_path
     def savePGN(self):
-        if hasattr(self, "tournamentPGN") and self.tournamentPGN.strip():
+        if hasattr(self, "tournamentPGN") and os.path.exists(self.tournamentPGN):
             path, _ = QFileDialog.getSaveFileName(self, "Save PGN", "", "PGN Files (*.pgn)")
-            if path:
-                with open(path, "w") as f:
-                    f.write(self.tournamentPGN)
+            if path and os.path.abspath(path) != os.path.abspath(self.tournamentPGN):
+                shutil.copyfile(self.tournamentPGN, path)
                 QMessageBox.information(self, "Success", "PGN saved!")
         else:
             QMessageBox.warning(self, "Error", "No PGN data available.")
 
+class BenchmarkThread(QThread):
+    benchProgress = pyqtSignal(str)
+    benchFinished = pyqtSignal(str)
+    def __init__(self, engines, positions, go, repeats):
+        super().__init__()
+        self.engines = engines
+        self.positions = positions
+        self.go = go
+        self.repeats = repeats
+        self.reports = []
+    def run(self):
+        baseline = loadBaseline()
+        text = ""
+        for config in self.engines:
+            try:
+                report = runBench(config, self.positions, self.go, self.repeats, progress=self.benchProgress.emit)
+            except Exception as e:
+                text += f"{config['name']}: {e}\n"
+                continue
+            self.reports.append(report)
+            report_text, regression = formatReport(report, baseline)
+            text += report_text + ("  REGRESSION\n" if regression else "") + "\n"
+        self.benchFinished.emit(text)
+
+class BenchmarkTab(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.engines = []
+        self.thread = None
+        self.initUI()
+        self.loadEngineList()
+    def initUI(self):
+        main_layout = QVBoxLayout()
+        top_layout = QHBoxLayout()
+        self.engineListWidget = QListWidget()
+        self.engineListWidget.setSelectionMode(QAbstractItemView.MultiSelection)
+        top_layout.addWidget(QLabel("Engines:"))
+        top_layout.addWidget(self.engineListWidget)
+        self.refreshButton = QPushButton("Refresh")
+        self.refreshButton.clicked.connect(self.loadEngineList)
+        top_layout.addWidget(self.refreshButton)
+        main_layout.addLayout(top_layout)
+        form_layout = QFormLayout()
+        self.limitCombo = QComboBox()
+        self.limitCombo.addItems(["Fixed depth", "Fixed nodes"])
+        self.limitSpin = QSpinBox()
+        self.limitSpin.setRange(1, 2000000000)
+        self.limitSpin.setValue(13)
+        self.repeatsSpin = QSpinBox()
+        self.repeatsSpin.setRange(1, 100)
+        self.repeatsSpin.setValue(3)
+        h_positions = QHBoxLayout()
+        self.positionsEdit = QLineEdit()
+        self.positionsEdit.setPlaceholderText(f"Built-in set ({len(BENCH_POSITIONS)} positions)")
+        self.browsePositionsButton = QPushButton("Browse")
+        self.browsePositionsButton.clicked.connect(self.browsePositions)
+        h_positions.addWidget(self.positionsEdit)
+        h_positions.addWidget(self.browsePositionsButton)
+        form_layout.addRow("Search limit:", self.limitCombo)
+        form_layout.addRow("Depth / nodes:", self.limitSpin)
+        form_layout.addRow("Repeats:", self.repeatsSpin)
+        form_layout.addRow("Positions (FEN/EPD):", h_positions)
+        main_layout.addLayout(form_layout)
+        buttons_layout = QHBoxLayout()
+        self.runButton = QPushButton("Run Benchmark")
+        self.runButton.clicked.connect(self.runBenchmark)
+        self.saveBaselineButton = QPushButton("Save as Baseline")
+        self.saveBaselineButton.clicked.connect(self.saveBaseline)
+        buttons_layout.addWidget(self.runButton)
+        buttons_layout.addWidget(self.saveBaselineButton)
+        main_layout.addLayout(buttons_layout)
+        self.progressLabel = QLabel("")
+        main_layout.addWidget(self.progressLabel)
+        self.resultsView = QPlainTextEdit()
+        self.resultsView.setReadOnly(True)
+        main_layout.addWidget(self.resultsView)
+        self.setLayout(main_layout)
+        self.setStyleSheet("""
+            QWidget { font-family: 'Segoe UI'; font-size: 11pt; }
+            QPushButton { background-color: #008CBA; color: white; border-radius: 4px; padding: 6px 10px; }
+            QPushButton:hover { background-color: #00A0DC; }
+            QLineEdit, QComboBox, QPlainTextEdit, QListWidget { background-color: #FFF; border: 1px solid #DDD; border-radius: 4px; padding: 4px; }
+            QLabel { color: #333; }
+        """)
+    def loadEngineList(self):
+        self.engineListWidget.clear()
+        try:
+            self.engines = engineRegistry().engines()
+        except Exception:
+            self.engines = []
+        for engine in self.engines:
+            self.engineListWidget.addItem(QListWidgetItem(engine.get("name", "Unknown")))
+    def browsePositions(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Benchmark Positions", "", "Position Files (*.epd *.fen *.txt);;All Files (*)")
+        if path:
+            self.positionsEdit.setText(path)
+    def runBenchmark(self):
+        if self.thread and self.thread.isRunning():
+            return
+        names = [item.text() for item in self.engineListWidget.selectedItems()]
+        selected_engines = [e for e in self.engines if e.get("name") in names]
+        if not selected_engines:
+            QMessageBox.warning(self, "Error", "Please select at least one engine!")
+            return
+        positions = BENCH_POSITIONS
+        if self.positionsEdit.text().strip():
+            try:
+                positions = loadPositions(self.positionsEdit.text().strip())
+            except (OSError, ValueError):
+                QMessageBox.warning(self, "Error", "Could not read the position file!")
+                return
+        limit = self.limitSpin.value()
+        go = goCommand(depth=limit) if self.limitCombo.currentIndex() == 0 else goCommand(nodes=limit)
+        self.resultsView.clear()
+        self.runButton.setEnabled(False)
+        self.thread = BenchmarkThread(selected_engines, positions, go, self.repeatsSpin.value())
+        self.thread.benchProgress.connect(self.progressLabel.setText)
+        self.thread.benchFinished.connect(self.benchmarkFinished)
+        self.thread.start()
+    def benchmarkFinished(self, text):
+        self.resultsView.setPlainText(text)
+        self.progressLabel.setText("Benchmark finished.")
+        self.runButton.setEnabled(True)
+    def saveBaseline(self):
+        if not self.thread or self.thread.isRunning() or not self.thread.reports:
+            QMessageBox.warning(self, "Error", "Run a benchmark first.")
+            return
+        saveBaseline(self.thread.reports)
+        QMessageBox.information(self, "Success", f"Baseline saved to {baselinePath()}")
+
+class PlayEngineThread(QThread):
+    engineMove = pyqtSignal(int, str, str, bool)
+    def __init__(self, config, think_ms=1000, ponder=True):
+        super().__init__()
+        self.config = config
+        self.think_ms = think_ms
+        self.ponder = ponder
+        self.requests = queue.Queue()
+    def newGame(self):
+        self.requests.put(("newgame",))
+    def play(self, game_id, fen, last_move):
+        self.requests.put(("move", game_id, fen, last_move))
+    def stopPondering(self):
+        self.requests.put(("stop",))
+    def configure(self, think_ms, ponder):
+        self.requests.put(("configure", think_ms, ponder))
+    def stop(self):
+        self.requests.put(("quit",))
+        self.wait()
+    def run(self):
+        engine = UCIEngine(self.config["command"], self.config.get("workingDirectory", ""), False, 0, 0, color=chess.BLACK)
+        for cmd in self.config.get("initStrings", []):
+            engine.sendCommand(cmd)
+        engine.sendCommand(f"setoption name Ponder value {'true' if self.ponder else 'false'}")
+        engine.newGame()
+        expected = None
+        try:
+            while True:
+                request = self.requests.get()
+                if request[0] == "quit":
+                    engine.stopPonder()
+                    return
+                if request[0] == "stop":
+                    engine.stopPonder()
+                elif request[0] == "newgame":
+                    engine.stopPonder()
+                    engine.newGame()
+                elif request[0] == "configure":
+                    self.think_ms = request[1]
+                    if request[2] != self.ponder:
+                        engine.stopPonder()
+                        self.ponder = request[2]
+                        engine.sendCommand(f"setoption name Ponder value {'true' if self.ponder else 'false'}")
+                elif request[0] == "move":
+                    _, game_id, fen, last_move = request
+                    hit = engine.pondering and last_move == expected
+                    if hit:
+                        bestmove, info_details, _ = engine.ponderHit(self.think_ms)
+                    else:
+                        engine.stopPonder()
+                        engine.sendCommand("position fen " + fen)
+                        bestmove, info_details, _ = engine.waitForBestmove(self.think_ms)
+                    self.engineMove.emit(game_id, bestmove or "", info_details or "", hit)
+                    expected = self.startPonder(engine, fen, bestmove)
+        finally:
+            engine.quit()
+    def startPonder(self, engine, fen, bestmove):
+        if not self.ponder or not bestmove or not engine.ponder_move:
+            return None
+        board = chess.Board(fen)
+        try:
+            for uci in (bestmove, engine.ponder_move):
+                move = chess.Move.from_uci(uci)
+                if move not in board.legal_moves:
+                    return None
+                board.push(move)
+        except ValueError:
+            return None
+        if board.is_game_over():
+            return None
+        engine.ponder(board.fen(), self.think_ms)
+        return engine.ponder_move
+
 class PlayGameTab(QWidget):
     def __init__(self):
         super().__init__()
         self.board = chess.Board()
         self.engine = None
+        self.game_id = 0
+        self.thinking = False
         self.game = chess.pgn.Game()
         self.node = self.game
         self.engineName = ""
@@ -613,8 +942,20 @@ class PlayGameTab(QWidget):
         self.selectEngineButton.clicked.connect(self.selectEngine)
         self.refreshEnginesButton = QPushButton("Refresh")
         self.refreshEnginesButton.clicked.connect(self.loadEngines)
+        self.thinkTimeSpin = QSpinBox()
+        self.thinkTimeSpin.setRange(10, 3600000)
+        self.thinkTimeSpin.setSingleStep(100)
+        self.thinkTimeSpin.setValue(1000)
+        self.thinkTimeSpin.setSuffix(" ms")
+        self.thinkTimeSpin.valueChanged.connect(self.configureEngine)
+        self.ponderCheck = QCheckBox("Ponder on your time")
+        self.ponderCheck.setChecked(True)
+        self.ponderCheck.toggled.connect(self.configureEngine)
         top_layout.addWidget(self.selectEngineButton)
         top_layout.addWidget(self.refreshEnginesButton)
+        top_layout.addWidget(QLabel("Think time:"))
+        top_layout.addWidget(self.thinkTimeSpin)
+        top_layout.addWidget(self.ponderCheck)
         main_layout.addLayout(top_layout)
         self.savePGNButton = QPushButton("Save PGN")
         self.savePGNButton.clicked.connect(self.savePGN)
@@ -630,16 +971,13 @@ class PlayGameTab(QWidget):
         """)
         self.updateBoardDisplay()
     def loadEngines(self):
-        path = getConfigPath()
         self.engines = []
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    self.engines = json.load(f)
-            except Exception:
-                QMessageBox.warning(self, "Error", "Error loading engines.json")
-        else:
+        try:
+            self.engines = engineRegistry().engines()
+        except FileNotFoundError:
             QMessageBox.information(self, "Info", "No engines.json found.")
+        except Exception:
+            QMessageBox.warning(self, "Error", "Error loading engines.json")
     def updateBoardDisplay(self):
         state = self.board.unicode(borders=True)
         self.boardArea.setPlainText(state + f"\n\nWhite: Human | Black: {self.engineName if self.engineName else '[not selected]'}")
@@ -655,29 +993,43 @@ class PlayGameTab(QWidget):
                 if e["name"] == item:
                     self.engineName = e["name"]
                     self.engineLabel.setText(f"Engine: {self.engineName} (Black)")
-                    self.engine = UCIEngine(e["command"], e.get("workingDirectory", ""), False, 0, 0, color=chess.BLACK)
-                    for cmd in e.get("initStrings", []):
-                        self.engine.sendCommand(cmd)
+                    self.closeEngine()
+                    self.engine = PlayEngineThread(e, self.thinkTimeSpin.value(), self.ponderCheck.isChecked())
+                    self.engine.engineMove.connect(self.engineMove)
+                    self.engine.start()
                     break
+    def configureEngine(self):
+        if self.engine:
+            self.engine.configure(self.thinkTimeSpin.value(), self.ponderCheck.isChecked())
+    def closeEngine(self):
+        if self.engine:
+            self.engine.stop()
+            self.engine = None
+        self.game_id += 1
+        self.thinking = False
     def startGame(self):
         if not self.engine:
             self.selectEngine()
             if not self.engine:
                 QMessageBox.warning(self, "Error", "No engine selected!")
                 return
-        self.engine.sendCommand("uci")
-        self.engine.sendCommand("isready")
+        self.engine.newGame()
+        self.game_id += 1
+        self.thinking = False
         self.board.reset()
         self.game = chess.pgn.Game()
         self.node = self.game
         self.game.headers["White"] = "Human"
         self.game.headers["Black"] = self.engineName if self.engineName else "Engine"
-        self.gameLog.append("Game started. You play as White. 1s per move.")
+        self.gameLog.append(f"Game started. You play as White. Engine thinks {self.thinkTimeSpin.value()} ms per move.")
         self.updateBoardDisplay()
     def humanMove(self):
         if self.board.is_game_over():
             self.gameLog.append("Game over!")
             return
+        if self.thinking:
+            self.gameLog.append("Engine is thinking...")
+            return
         move_str = self.moveInput.text().strip()
         try:
             move = self.board.parse_san(move_str)
@@ -694,22 +1046,31 @@ class PlayGameTab(QWidget):
         self.node = self.node.add_variation(move)
         self.updateBoardDisplay()
         self.gameLog.append(f"You: {move.uci()}")
-        if self.engine:
-            self.engine.sendCommand("position fen " + self.board.fen())
-            bestmove, info_details, _ = self.engine.waitForBestmove(1000)
-            if bestmove:
-                try:
-                    engine_move = chess.Move.from_uci(bestmove)
-                    self.board.push(engine_move)
-                    self.node = self.node.add_variation(engine_move)
-                    self.updateBoardDisplay()
-                    self.gameLog.append(f"Engine: {engine_move.uci()}")
-                    self.engineDebug.setText(info_details if info_details else "No debug info")
-                except Exception:
-                    self.gameLog.append("Error in engine move.")
-            else:
-                self.gameLog.append("No response from engine.")
+        if self.engine and self.board.is_game_over():
+            self.engine.stopPondering()
+        elif self.engine:
+            self.thinking = True
+            self.engine.play(self.game_id, self.board.fen(), move.uci())
         self.moveInput.clear()
+    def engineMove(self, game_id, bestmove, info_details, ponderhit):
+        if game_id != self.game_id:
+            return
+        self.thinking = False
+        if not bestmove:
+            self.gameLog.append("No response from engine.")
+            return
+        try:
+            engine_move = chess.Move.from_uci(bestmove)
+        except ValueError:
+            engine_move = None
+        if engine_move not in self.board.legal_moves:
+            self.gameLog.append("Error in engine move.")
+            return
+        self.board.push(engine_move)
+        self.node = self.node.add_variation(engine_move)
+        self.updateBoardDisplay()
+        self.gameLog.append(f"Engine: {engine_move.uci()}" + (" (ponder hit)" if ponderhit else ""))
+        self.engineDebug.setText(info_details if info_details else "No debug info")
     def savePGN(self):
         pgn_text = str(self.game)
         if not pgn_text.strip():
@@ -721,6 +1082,164 @@ class PlayGameTab(QWidget):
                 f.write(pgn_text)
             QMessageBox.information(self, "Success", "PGN saved!")
             
+class IndexThread(QThread):
+    indexProgress = pyqtSignal(str)
+    indexReady = pyqtSignal(object)
+    indexFailed = pyqtSignal(str)
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+    def run(self):
+        try:
+            index = PGNIndex(self.path, lambda games, fraction: self.indexProgress.emit(f"Indexing: {games} games ({fraction:.0%})"))
+        except (OSError, ValueError) as e:
+            self.indexFailed.emit(str(e))
+            return
+        self.indexReady.emit(index)
+
+class GameListModel(QAbstractTableModel):
+    def __init__(self):
+        super().__init__()
+        self.pgn = None
+        self.rows = []
+    def setGames(self, pgn, rows):
+        self.beginResetModel()
+        self.pgn = pgn
+        self.rows = rows
+        self.endResetModel()
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(INDEX_FIELDS) + 1
+    def data(self, model_index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not model_index.isValid():
+            return None
+        game = self.rows[model_index.row()]
+        return str(game + 1) if model_index.column() == 0 else self.pgn.headers[game][model_index.column() - 1]
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return "#" if section == 0 else INDEX_FIELDS[section - 1]
+        return None
+
+class ReplayTab(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.index = None
+        self.thread = None
+        self.board = chess.Board()
+        self.nodes = []
+        self.moves = []
+        self.ply = 0
+        self.initUI()
+    def initUI(self):
+        main_layout = QVBoxLayout()
+        file_layout = QHBoxLayout()
+        self.pathEdit = QLineEdit()
+        self.pathEdit.setReadOnly(True)
+        self.openButton = QPushButton("Open PGN")
+        self.openButton.clicked.connect(self.openFile)
+        file_layout.addWidget(self.pathEdit)
+        file_layout.addWidget(self.openButton)
+        main_layout.addLayout(file_layout)
+        self.filterEdit = QLineEdit()
+        self.filterEdit.setPlaceholderText("Filter by player, result, event, round or date")
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(200)
+        self.filterTimer.timeout.connect(self.applyFilter)
+        self.filterEdit.textChanged.connect(self.filterTimer.start)
+        main_layout.addWidget(self.filterEdit)
+        self.statusLabel = QLabel("No file loaded.")
+        main_layout.addWidget(self.statusLabel)
+        self.gameModel = GameListModel()
+        self.gameTable = QTableView()
+        self.gameTable.setModel(self.gameModel)
+        self.gameTable.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.gameTable.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.gameTable.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.gameTable.verticalHeader().setVisible(False)
+        self.gameTable.selectionModel().currentRowChanged.connect(self.openGame)
+        main_layout.addWidget(self.gameTable)
+        board_group = QGroupBox("Replay")
+        board_layout = QVBoxLayout()
+        self.boardView = QPlainTextEdit()
+        self.boardView.setReadOnly(True)
+        board_layout.addWidget(self.boardView)
+        step_layout = QHBoxLayout()
+        for text, delta in (("|<", -10**6), ("<", -1), (">", 1), (">|", 10**6)):
+            button = QPushButton(text)
+            button.clicked.connect(lambda _, delta=delta: self.step(delta))
+            step_layout.addWidget(button)
+        board_layout.addLayout(step_layout)
+        board_group.setLayout(board_layout)
+        main_layout.addWidget(board_group)
+        self.setLayout(main_layout)
+    def openFile(self):
+        if self.thread and self.thread.isRunning():
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "Open PGN", outputDir(), "PGN Files (*.pgn);;All Files (*)")
+        if path:
+            self.loadFile(path)
+    def loadFile(self, path):
+        self.pathEdit.setText(path)
+        self.statusLabel.setText("Indexing...")
+        self.openButton.setEnabled(False)
+        self.thread = IndexThread(path)
+        self.thread.indexProgress.connect(self.statusLabel.setText)
+        self.thread.indexReady.connect(self.indexReady)
+        self.thread.indexFailed.connect(self.indexFailed)
+        self.thread.start()
+    def indexFailed(self, text):
+        self.openButton.setEnabled(True)
+        self.statusLabel.setText("No file loaded.")
+        QMessageBox.warning(self, "Error", f"Error reading PGN: {text}")
+    def indexReady(self, index):
+        self.openButton.setEnabled(True)
+        if self.index:
+            self.index.close()
+        self.index = index
+        self.nodes = []
+        self.board = chess.Board()
+        self.renderBoard()
+        self.applyFilter()
+    def applyFilter(self):
+        if not self.index:
+            return
+        rows = self.index.filter(self.filterEdit.text())
+        self.gameModel.setGames(self.index, rows)
+        source = "cached index" if self.index.cached == "full" else "new index"
+        self.statusLabel.setText(f"{len(rows)} of {len(self.index)} games ({source})")
+    def openGame(self, current, previous=None):
+        if not current.isValid():
+            return
+        game = self.index.game(self.gameModel.rows[current.row()])
+        if game is None:
+            return
+        self.board = game.board()
+        self.nodes = list(game.mainline())
+        self.moves = []
+        for node in self.nodes:
+            self.moves.append(self.board.san(node.move))
+            self.board.push(node.move)
+        self.board = game.board()
+        self.ply = 0
+        self.renderBoard()
+    def step(self, delta):
+        target = max(0, min(len(self.nodes), self.ply + delta))
+        while self.ply < target:
+            self.board.push(self.nodes[self.ply].move)
+            self.ply += 1
+        while self.ply > target:
+            self.board.pop()
+            self.ply -= 1
+        self.renderBoard()
+    def renderBoard(self):
+        text = f"{self.board.unicode(borders=True)}\nMove {self.ply}/{len(self.nodes)}"
+        if self.ply:
+            node = self.nodes[self.ply-1]
+            text += f": {self.moves[self.ply-1]}" + (f" {{ {node.comment} }}" if node.comment else "")
+        self.boardView.setPlainText(text)
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -730,7 +1249,9 @@ class MainWindow(QMainWindow):
         tabs = QTabWidget()
         tabs.addTab(EngineConfigTab(), "Engine Configuration")
         tabs.addTab(TournamentTab(), "Tournament")
+        tabs.addTab(BenchmarkTab(), "Benchmark")
         play_tab = PlayGameTab()
+        self.play_tab = play_tab
         play_container = QWidget()
         play_layout = QVBoxLayout()
         start_game_btn = QPushButton("Start Game vs. Engine")
@@ -739,8 +1260,12 @@ class MainWindow(QMainWindow):
         play_layout.addWidget(play_tab)
         play_container.setLayout(play_layout)
         tabs.addTab(play_container, "Game")
+        tabs.addTab(ReplayTab(), "Replay")
         self.setCentralWidget(tabs)
         self.setStyleSheet("QMainWindow { background-color: #ECEFF1; }")
+    def closeEvent(self, event):
+        self.play_tab.closeEngine()
+        super().closeEvent(event)
         
 if __name__ == "__main__":
     app = QApplication(sys.argv)
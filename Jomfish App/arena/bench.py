@@ -0,0 +1,172 @@
+import os, sys, json, math, argparse
+import chess
+from uci import UCIEngine
+from registry import getConfigPath, loadEngineConfigs
+
+BENCH_POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 11",
+    "4rrk1/pp1n3p/3q2pQ/2p1pb2/2PP4/2P3N1/P2B2PP/4RRK1 b - - 7 19",
+    "rq3rk1/ppp2ppp/1bnpb3/3N2B1/3NP3/7P/PPPQ1PP1/2KR3R w - - 7 14",
+    "r1bq1r1k/1pp1n1pp/1p1p4/4p2Q/4Pp2/1BNP4/PPP2PPP/3R1RK1 w - - 2 14",
+    "r3r1k1/2p2ppp/p1p1bn2/8/1q2P3/2NPQN2/PPP3PP/R4RK1 b - - 2 15",
+    "r1bbk1nr/pp3p1p/2n5/1N4p1/2Np1B2/8/PPP2PPP/2KR1B1R w kq - 0 13",
+]
+
+def loadPositions(path):
+    positions = []
+    with open(path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                board = chess.Board(line)
+            except ValueError:
+                board, _ = chess.Board.from_epd(line)
+            positions.append(board.fen())
+    return positions
+
+def baselinePath():
+    return os.path.join(os.path.dirname(getConfigPath()), "bench-baseline.json")
+
+def loadBaseline(path=None):
+    path = path or baselinePath()
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def saveBaseline(reports, path=None):
+    path = path or baselinePath()
+    baseline = loadBaseline(path)
+    baseline.update({report["engine"]: report for report in reports})
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(baseline, f, indent=4)
+    os.replace(tmp_path, path)
+
+def goCommand(depth=None, nodes=None):
+    return f"go nodes {int(nodes)}" if nodes else f"go depth {int(depth or 13)}"
+
+def benchPosition(engine, fen, go, timeout_ms):
+    engine.newGame()
+    engine.sendCommand("position fen " + fen)
+    bestmove, _, _ = engine.waitForBestmove(timeout_ms, go, "off")
+    info = engine.last_info
+    nodes = info.nodes if info and info.nodes is not None else 0
+    elapsed = info.time / 1000.0 if info and info.time else engine.think_time
+    return {"fen": fen, "bestmove": bestmove, "depth": info.depth if info else None, "nodes": nodes,
+            "time_ms": round(elapsed * 1000, 1), "nps": int(nodes / elapsed) if elapsed > 0 else 0}
+
+def runBench(config, positions, go, repeats=3, timeout_ms=60000, progress=None):
+    engine = UCIEngine(config["command"], config.get("workingDirectory", ""))
+    if not engine.isRunning():
+        raise Exception(f"Engine {config['name']} could not be started.")
+    for cmd in config.get("initStrings", []):
+        engine.sendCommand(cmd)
+    runs = []
+    try:
+        for repeat in range(repeats):
+            run = []
+            for index, fen in enumerate(positions):
+                run.append(benchPosition(engine, fen, go, timeout_ms))
+                if progress:
+                    progress(f"{config['name']}: run {repeat+1}/{repeats}, position {index+1}/{len(positions)}: "
+                             f"{run[-1]['bestmove']} nodes {run[-1]['nodes']} nps {run[-1]['nps']}")
+            runs.append(run)
+    finally:
+        engine.quit()
+    return summarizeBench(config["name"], go, runs)
+
+def summarizeBench(name, go, runs):
+    totals = [(sum(p["nodes"] for p in run), sum(p["time_ms"] for p in run) / 1000.0) for run in runs]
+    nps = [nodes / elapsed if elapsed > 0 else 0.0 for nodes, elapsed in totals]
+    mean = sum(nps) / len(nps)
+    stdev = math.sqrt(sum((x - mean) ** 2 for x in nps) / (len(nps) - 1)) if len(nps) > 1 else 0.0
+    positions = []
+    for index, first in enumerate(runs[0]):
+        position = dict(first)
+        position["nps"] = round(sum(run[index]["nps"] for run in runs) / len(runs))
+        positions.append(position)
+    return {"engine": name, "go": go, "repeats": len(runs), "signature": totals[0][0],
+            "deterministic": len({nodes for nodes, _ in totals}) == 1, "nps": round(mean), "nps_stdev": round(stdev),
+            "nps_runs": [round(x) for x in nps], "positions": positions}
+
+def compareBaseline(report, baseline):
+    base = baseline.get(report["engine"])
+    if not base:
+        return ["No baseline for this engine."], False
+    if base["go"] != report["go"] or len(base["positions"]) != len(report["positions"]):
+        return [f"Baseline was run with '{base['go']}' on {len(base['positions'])} positions; not comparable."], False
+    lines = []
+    regression = False
+    if report["signature"] == base["signature"]:
+        lines.append(f"Signature {report['signature']} matches the baseline.")
+    else:
+        lines.append(f"Signature {report['signature']} differs from the baseline {base['signature']} (search changed).")
+        regression = True
+    noise = 2 * max(report["nps_stdev"], base["nps_stdev"])
+    change = report["nps"] - base["nps"]
+    percent = 100.0 * change / base["nps"] if base["nps"] else 0.0
+    verdict = "within noise" if abs(change) <= noise else ("slower" if change < 0 else "faster")
+    if verdict == "slower":
+        regression = True
+    lines.append(f"NPS {report['nps']} vs. {base['nps']} ({percent:+.1f}%, {verdict}).")
+    changed = [p["fen"] for p, b in zip(report["positions"], base["positions"]) if p["fen"] == b["fen"] and p["bestmove"] != b["bestmove"]]
+    if changed:
+        lines.append(f"Best move changed in {len(changed)} position(s): " + "; ".join(changed))
+    return lines, regression
+
+def formatReport(report, baseline=None):
+    lines = [f"{report['engine']} ({report['go']}, {len(report['positions'])} positions x {report['repeats']} runs)"]
+    for p in report["positions"]:
+        lines.append(f"  {p['fen']}: {p['bestmove']} depth {p['depth']} nodes {p['nodes']} time {p['time_ms']}ms nps {p['nps']}")
+    lines.append(f"  Signature: {report['signature']}{'' if report['deterministic'] else ' (node counts varied between runs)'}")
+    lines.append(f"  NPS: {report['nps']} +/- {report['nps_stdev']} (runs: {', '.join(map(str, report['nps_runs']))})")
+    regression = False
+    if baseline is not None:
+        comparison, regression = compareBaseline(report, baseline)
+        lines += ["  " + line for line in comparison]
+    return "\n".join(lines) + "\n", regression
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description="Benchmark UCI engines on fixed positions and compare against a saved baseline.")
+    parser.add_argument("--config", default=getConfigPath(), help="engine list (config.json)")
+    parser.add_argument("--engines", nargs="*", help="engine names to benchmark (default: all)")
+    parser.add_argument("--depth", type=int, default=13, help="fixed search depth per position")
+    parser.add_argument("--nodes", type=int, help="fixed node count per position (overrides --depth)")
+    parser.add_argument("--repeats", type=int, default=3, help="runs over the position set, for NPS variance")
+    parser.add_argument("--positions", help="FEN/EPD file, one position per line (default: built-in set)")
+    parser.add_argument("--timeout", type=int, default=60000, help="timeout per position in milliseconds")
+    parser.add_argument("--baseline", default=baselinePath(), help="baseline file")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    engines = loadEngineConfigs(args.config)
+    if args.engines:
+        engines = [e for e in engines if e.get("name") in args.engines]
+    if not engines:
+        print("No engines selected!", file=sys.stderr)
+        return 1
+    positions = loadPositions(args.positions) if args.positions else BENCH_POSITIONS
+    go = goCommand(args.depth, args.nodes)
+    baseline = loadBaseline(args.baseline)
+    reports = []
+    failed = False
+    for config in engines:
+        report = runBench(config, positions, go, args.repeats, args.timeout, lambda text: print(text, file=sys.stderr, flush=True))
+        text, regression = formatReport(report, baseline)
+        print(text, flush=True)
+        reports.append(report)
+        failed = failed or regression
+    if args.save_baseline:
+        saveBaseline(reports, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    return 1 if failed and not args.save_baseline else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import os, sys, json, time, socket, argparse, threading, socketserver
+from uci import EnginePool
+from openings import Opening
+from telemetry import EngineMetrics
+from registry import getConfigPath, loadEngineConfigs
+from tournament import simulate_game, TimeControl, Adjudication, EngineFailure
+
+DEFAULT_PORT = 7423
+HEARTBEAT_INTERVAL = 5.0
+HEARTBEAT_TIMEOUT = 30.0
+RECONNECT_DELAY = 2.0
+
+def parseAddress(text, default_host):
+    host, _, port = text.rpartition(":")
+    return host or default_host, int(port or DEFAULT_PORT)
+
+def send(stream, message):
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+def receive(stream):
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+def gameMessage(game, tc, adjudication, headers, capture):
+    game_id, white, black, round_number, opening = game
+    return {"type": "game", "id": game_id, "white": white["name"], "black": black["name"], "headers": headers,
+            "opening": opening.__getstate__() if opening else None, "tc": vars(tc),
+            "adjudication": vars(adjudication) if adjudication else None, "capture": capture}
+
+def metricsState(metrics):
+    return [m.state() for m in metrics] if metrics else None
+
+def loadMetrics(states):
+    return [EngineMetrics.fromState(state) for state in states] if states else None
+
+def outcomeMessage(game_id, outcome):
+    game_log, result, pgn_text, metrics = outcome
+    return {"type": "result", "id": game_id, "log": game_log, "result": result, "pgn": pgn_text, "metrics": metricsState(metrics)}
+
+def failureMessage(game_id, error):
+    if isinstance(error, EngineFailure):
+        return {"type": "failure", "id": game_id, "name": error.name, "color": error.color, "reason": error.reason,
+                "log": error.game_log, "metrics": metricsState(error.metrics), "pgn": error.pgn_text}
+    return {"type": "error", "id": game_id, "error": str(error)}
+
+def messageOutcome(message):
+    if message["type"] == "result":
+        return (message["log"], message["result"], message["pgn"], loadMetrics(message["metrics"])), None
+    if message["type"] == "failure":
+        return None, EngineFailure(message["name"], message["color"], message["reason"], message["log"],
+                                   loadMetrics(message["metrics"]), message["pgn"])
+    return None, Exception(message.get("error", "Error during simulation."))
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        coordinator = self.server.coordinator
+        self.request.settimeout(HEARTBEAT_TIMEOUT)
+        try:
+            hello = receive(self.rfile)
+        except (OSError, ValueError):
+            return
+        if not hello or hello.get("type") != "hello":
+            return
+        worker = f"{hello.get('worker', '?')}@{self.client_address[0]}"
+        engines = set(hello.get("engines", []))
+        print(f"Worker {worker} connected with {', '.join(sorted(engines)) or 'no engines'}.", flush=True)
+        while True:
+            game = coordinator.next(engines)
+            if game is None:
+                try:
+                    send(self.wfile, {"type": "done"})
+                except OSError:
+                    pass
+                return
+            try:
+                send(self.wfile, coordinator.message(game))
+                message = receive(self.rfile)
+                while message and message.get("type") == "ping":
+                    message = receive(self.rfile)
+                if not message or message.get("id") != game[0]:
+                    raise ConnectionError("connection closed")
+            except (OSError, ValueError) as error:
+                coordinator.lost(game, worker, error)
+                return
+            coordinator.complete(game, *messageOutcome(message))
+
+class Coordinator:
+    def __init__(self, source, address, tc, adjudication, headers, finished, capture="off"):
+        self.source = source
+        self.tc = tc
+        self.adjudication = adjudication
+        self.headers = headers
+        self.finished = finished
+        self.capture = capture
+        self.condition = threading.Condition()
+        self.server = socketserver.ThreadingTCPServer(address, WorkerHandler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.coordinator = self
+        self.server.server_bind()
+        self.server.server_activate()
+        self.address = self.server.server_address
+    def done(self):
+        return self.source.exhausted and not self.source.ready and not self.source.running
+    def next(self, engines):
+        with self.condition:
+            while True:
+                game = next((g for g in self.source.candidates() if g[1]["name"] in engines and g[2]["name"] in engines), None)
+                if game:
+                    self.source.take(game)
+                    return game
+                if self.done():
+                    return None
+                self.condition.wait()
+    def message(self, game):
+        return gameMessage(game, self.tc, self.adjudication, self.headers(game[3]), self.capture)
+    def complete(self, game, outcome, error=None):
+        with self.condition:
+            result = self.finished(game, outcome, error)
+            if result is not None:
+                self.source.finish(game, result)
+            self.condition.notify_all()
+    def lost(self, game, worker, error):
+        print(f"Worker {worker} lost ({error}); reassigning {game[1]['name']} (White) vs. {game[2]['name']} (Black).", flush=True)
+        with self.condition:
+            self.source.requeue(game)
+            self.condition.notify_all()
+    def run(self):
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        print(f"Waiting for workers on {self.address[0]}:{self.address[1]}.", flush=True)
+        try:
+            with self.condition:
+                while not self.done():
+                    self.source.candidates()
+                    self.condition.wait(1.0)
+                self.condition.notify_all()
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+
+class WorkerConnection:
+    def __init__(self, address, name, engines):
+        self.socket = socket.create_connection(address)
+        self.stream = self.socket.makefile("rwb")
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.write({"type": "hello", "worker": name, "engines": sorted(engines)})
+        threading.Thread(target=self.heartbeat, daemon=True).start()
+    def write(self, message):
+        with self.lock:
+            send(self.stream, message)
+    def heartbeat(self):
+        while not self.stopped.wait(HEARTBEAT_INTERVAL):
+            try:
+                self.write({"type": "ping"})
+            except OSError:
+                return
+    def close(self):
+        self.stopped.set()
+        self.stream.close()
+        self.socket.close()
+
+def connectWorker(address, name, engines):
+    while True:
+        try:
+            return WorkerConnection(address, name, engines)
+        except ConnectionRefusedError:
+            time.sleep(RECONNECT_DELAY)
+
+def playGame(pool, engines, message):
+    opening = Opening(*message["opening"]) if message["opening"] else None
+    adjudication = Adjudication(**message["adjudication"]) if message["adjudication"] else None
+    try:
+        outcome = simulate_game(pool, engines[message["white"]], engines[message["black"]], TimeControl(**message["tc"]),
+                                headers=message["headers"], adjudication=adjudication, opening=opening, capture=message["capture"])
+    except Exception as error:
+        return failureMessage(message["id"], error)
+    return outcomeMessage(message["id"], outcome)
+
+def runSlot(address, name, engines, pool):
+    connection = connectWorker(address, name, engines)
+    try:
+        while True:
+            message = receive(connection.stream)
+            if not message or message.get("type") != "game":
+                return
+            print(f"{name}: {message['white']} (White) vs. {message['black']} (Black)", flush=True)
+            reply = playGame(pool, engines, message)
+            connection.write(reply)
+            print(f"{name}: {message['white']} (White) vs. {message['black']} (Black): {reply.get('result', reply['type'])}", flush=True)
+    except (OSError, ValueError):
+        return
+    finally:
+        connection.close()
+
+def runWorker(address, name, engines, concurrency):
+    pool = EnginePool(2 * concurrency)
+    slots = [threading.Thread(target=runSlot, args=(address, f"{name}/{slot+1}", engines, pool), daemon=True) for slot in range(concurrency)]
+    try:
+        for slot in slots:
+            slot.start()
+        for slot in slots:
+            while slot.is_alive():
+                slot.join(1.0)
+    finally:
+        pool.close()
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description="Play games for a tournament coordinator started with headless.py --serve.")
+    parser.add_argument("--connect", default=f"127.0.0.1:{DEFAULT_PORT}", help="coordinator address as [host:]port")
+    parser.add_argument("--config", default=getConfigPath(), help="local engine list (config.json); engines are matched by name")
+    parser.add_argument("--engines", nargs="*", help="engine names this worker offers (default: all)")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1, help="games played in parallel")
+    parser.add_argument("--name", default=socket.gethostname(), help="worker name shown by the coordinator")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    engines = {e["name"]: e for e in loadEngineConfigs(args.config) if not args.engines or e.get("name") in args.engines}
+    if not engines:
+        print("No engines to offer!", file=sys.stderr)
+        return 1
+    try:
+        runWorker(parseAddress(args.connect, "127.0.0.1"), args.name, engines, max(1, args.concurrency))
+    except KeyboardInterrupt:
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import time, itertools
+
+LOOKAHEAD = 64
+MAX_RETRIES = 2
+FORMATS = ("roundrobin", "gauntlet", "swiss")
+
+def resultPoints(result):
+    return {"1-0": (1.0, 0.0), "0-1": (0.0, 1.0), "1/2-1/2": (0.5, 0.5)}.get(result, (0.0, 0.0))
+
+class GameSource:
+    def __init__(self, games=(), completed=None):
+        self.games = iter(games)
+        self.completed = completed or {}
+        self.ready = []
+        self.running = {}
+        self.load = {}
+        self.cost = {}
+        self.played = {}
+        self.attempts = {}
+        self.max_retries = MAX_RETRIES
+        self.exhausted = False
+    def generate(self):
+        return next(self.games, None)
+    def fill(self):
+        while len(self.ready) < LOOKAHEAD and not self.exhausted:
+            game = self.generate()
+            if game is None:
+                self.exhausted = not self.running
+                break
+            record = self.completed.get(game[0])
+            if record and (record["white"], record["black"]) == (game[1]["name"], game[2]["name"]):
+                self.finish(game, record["result"])
+            else:
+                self.ready.append(game)
+    def expected(self, name):
+        if name in self.cost:
+            return self.cost[name]
+        return sum(self.cost.values()) / len(self.cost) if self.cost else 0.0
+    def candidates(self):
+        self.fill()
+        return sorted(self.ready, key=lambda game: (-self.expected(game[1]["name"]) - self.expected(game[2]["name"]),
+                                                    self.load.get(game[1]["name"], 0) + self.load.get(game[2]["name"], 0)))
+    def take(self, game):
+        self.ready.remove(game)
+        self.running[game[0]] = time.monotonic()
+        for engine in game[1:3]:
+            self.load[engine["name"]] = self.load.get(engine["name"], 0) + 1
+    def requeue(self, game):
+        self.running.pop(game[0], None)
+        for engine in game[1:3]:
+            self.load[engine["name"]] -= 1
+        self.ready.insert(0, game)
+    def retry(self, game):
+        attempts = self.attempts.get(game[0], 0)
+        if attempts >= self.max_retries:
+            return False
+        self.attempts[game[0]] = attempts + 1
+        self.requeue(game)
+        return True
+    def finish(self, game, result):
+        started = self.running.pop(game[0], None)
+        for engine in game[1:3]:
+            name = engine["name"]
+            if started is not None:
+                self.load[name] -= 1
+                count = self.played.get(name, 0) + 1
+                self.played[name] = count
+                self.cost[name] = self.cost.get(name, 0.0) + (time.monotonic() - started - self.cost.get(name, 0.0)) / count
+        self.exhausted = False
+
+def pairGames(pairs, round_number, book, first_id, pair_number):
+    games = []
+    for white, black in pairs:
+        opening = book.pick(pair_number) if book else None
+        pair_number += 1
+        games.append((first_id + len(games), white, black, round_number, opening))
+        games.append((first_id + len(games), black, white, round_number, opening))
+    return games, pair_number
+
+class RoundRobin(GameSource):
+    def __init__(self, engines, rounds, book=None, completed=None):
+        super().__init__(completed=completed)
+        self.engines = engines
+        self.rounds = rounds
+        self.games = self.schedule(book)
+    def pairs(self, round_number):
+        return itertools.combinations(self.engines, 2)
+    def schedule(self, book):
+        game_id, pair_number = 0, 0
+        for round_number in range(1, self.rounds+1):
+            for pair in self.pairs(round_number):
+                games, pair_number = pairGames([pair], round_number, book, game_id, pair_number)
+                game_id += len(games)
+                yield from games
+    def total(self):
+        return self.rounds * len(list(self.pairs(1))) * 2
+
+class Gauntlet(RoundRobin):
+    def pairs(self, round_number):
+        return [(self.engines[0], opponent) for opponent in self.engines[1:]]
+
+class Swiss(GameSource):
+    def __init__(self, engines, rounds, book=None, completed=None):
+        super().__init__(completed=completed)
+        self.engines = engines
+        self.rounds = rounds
+        self.book = book
+        self.scores = {e["name"]: 0.0 for e in engines}
+        self.met = set()
+        self.byes = set()
+        self.round = 0
+        self.game_id = 0
+        self.pair_number = 0
+        self.pending = 0
+        self.queued = []
+    def total(self):
+        return self.rounds * (len(self.engines) // 2) * 2
+    def generate(self):
+        if not self.queued and not self.pending and self.round < self.rounds:
+            self.round += 1
+            self.queued, self.pair_number = pairGames(self.pairRound(), self.round, self.book, self.game_id, self.pair_number)
+            self.game_id += len(self.queued)
+            self.pending = len(self.queued)
+        if not self.queued:
+            return None
+        return self.queued.pop(0)
+    def finish(self, game, result):
+        super().finish(game, result)
+        white_points, black_points = resultPoints(result)
+        self.scores[game[1]["name"]] += white_points
+        self.scores[game[2]["name"]] += black_points
+        self.pending -= 1
+    def pairRound(self):
+        order = {e["name"]: index for index, e in enumerate(self.engines)}
+        players = sorted(self.engines, key=lambda e: (-self.scores[e["name"]], order[e["name"]]))
+        if len(players) % 2:
+            bye = next((p for p in reversed(players) if p["name"] not in self.byes), players[-1])
+            self.byes.add(bye["name"])
+            self.scores[bye["name"]] += 2.0
+            players.remove(bye)
+        pairs = self.pairUp(players, True) or self.pairUp(players, False)
+        for white, black in pairs:
+            self.met.add(frozenset((white["name"], black["name"])))
+        return pairs
+    def pairUp(self, players, avoid_rematches):
+        if not players:
+            return []
+        first = players[0]
+        for opponent in players[1:]:
+            if avoid_rematches and frozenset((first["name"], opponent["name"])) in self.met:
+                continue
+            rest = self.pairUp([p for p in players[1:] if p is not opponent], avoid_rematches)
+            if rest is not None:
+                return [(first, opponent)] + rest
+        return None
+
+def makeFormat(name, engines, rounds, book=None, completed=None):
+    return {"roundrobin": RoundRobin, "gauntlet": Gauntlet, "swiss": Swiss}[name](engines, rounds, book, completed)
@@ -0,0 +1,264 @@
+import os, sys, json, argparse, asyncio, threading, concurrent.futures, multiprocessing.util
+from uci import EnginePool
+from uci_async import AsyncEnginePool
+from sprt import SPRT, runPairedMatch
+from openings import OpeningBook
+from telemetry import Telemetry
+from scheduler import ResourceScheduler, runScheduled
+from formats import FORMATS, makeFormat
+from distributed import Coordinator, parseAddress
+from resultsdb import ResultStore
+from registry import getConfigPath, loadEngineConfigs
+from tournament import (addResult, formatSummary, simulate_game,
+                        simulate_game_async, TimeControl, GameFileWriter, gameHeaders, scheduleParams, TournamentJournal,
+                        Adjudication, CAPTURE_LEVELS, captureDir, capturePath, EngineFailure, failedGame)
+
+EVENT = "Headless Tournament"
+worker_pool = None
+
+def initWorker():
+    global worker_pool
+    worker_pool = EnginePool(2)
+    multiprocessing.util.Finalize(None, worker_pool.close, exitpriority=10)
+
+def runGame(white_config, black_config, tc, headers, adjudication, opening=None, capture="off", capture_path=None, cores=None):
+    return simulate_game(worker_pool, white_config, black_config, tc, headers=headers, adjudication=adjudication, opening=opening,
+                         capture=capture, capture_path=capture_path, cores=cores)
+
+def gameCapturePath(capture_dir, game_number):
+    return capturePath(capture_dir, game_number) if capture_dir else None
+
+def futureFinished(finished):
+    def done(game, future):
+        try:
+            outcome = future.result()
+        except Exception as error:
+            return finished(game, None, error)
+        return finished(game, outcome)
+    return done
+
+def runProcessPool(games, tc, adjudication, concurrency, finished, capture="off", capture_dir=None, scheduler=None):
+    with concurrent.futures.ProcessPoolExecutor(max_workers=concurrency, initializer=initWorker) as executor:
+        def submit(game, cores):
+            game_id, white, black, round_number, opening = game
+            return executor.submit(runGame, white, black, tc, gameHeaders(EVENT, round_number, tc), adjudication, opening,
+                                   capture, gameCapturePath(capture_dir, game_id+1), cores)
+        try:
+            runScheduled(games, submit, futureFinished(finished), concurrency, scheduler)
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+def runAsync(games, tc, adjudication, concurrency, finished, capture_dir=None, scheduler=None):
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    pool = AsyncEnginePool(concurrency)
+    submitted = set()
+    def submit(game, cores):
+        game_id, white, black, round_number, opening = game
+        future = asyncio.run_coroutine_threadsafe(simulate_game_async(pool, white, black, tc, gameHeaders(EVENT, round_number, tc), adjudication,
+                                                                      opening, gameCapturePath(capture_dir, game_id+1), cores), loop)
+        submitted.add(future)
+        future.add_done_callback(submitted.discard)
+        return future
+    try:
+        runScheduled(games, submit, futureFinished(finished), concurrency, scheduler)
+    except KeyboardInterrupt:
+        for future in list(submitted):
+            future.cancel()
+        raise
+    finally:
+        asyncio.run_coroutine_threadsafe(pool.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+def runMatch(args, engines, tc, adjudication, book, capture_dir, scheduler):
+    sprt = SPRT(*[float(x) for x in args.sprt.split(",")], args.alpha, args.beta)
+    results = {}
+    game_index = 0
+    submitted = 0
+    telemetry = Telemetry(metricsPrefix(args))
+    pgn_writer = GameFileWriter(args.pgn, args.sync_every)
+    log_writer = GameFileWriter(args.log, args.sync_every)
+    store = ResultStore(args.db)
+    tournament_id = store.tournament(scheduleParams(engines[:2], args.max_pairs, tc, EVENT, book, "sprt"))
+    def finished(white, black, outcome, round_number, opening):
+        nonlocal game_index
+        game_log, result, pgn_text, metrics = outcome
+        game_index += 1
+        header = f"Game {game_index}: {white['name']} (White) vs. {black['name']} (Black)"
+        if pgn_text:
+            pgn_writer.write(pgn_text)
+        log_writer.write(f"{header}\n{game_log}\nResult: {result}")
+        telemetry.add(game_index, metrics)
+        store.add(tournament_id, game_index, round_number, white, black, tc, opening, result, pgn_text, metrics)
+        addResult(results, white['name'], black['name'], result)
+        print(f"{header}: {result}", flush=True)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=args.concurrency, initializer=initWorker) as executor:
+            def submit(white, black, round_number, opening, cores):
+                nonlocal submitted
+                submitted += 1
+                return executor.submit(runGame, white, black, tc, gameHeaders(EVENT, round_number, tc), adjudication, opening,
+                                       args.capture, gameCapturePath(capture_dir, submitted), cores)
+            def counted(white, black, outcome, round_number, opening):
+                finished(white, black, outcome, round_number, opening)
+                print(sprt.status(), flush=True)
+            def replayed(white, black, error):
+                if isinstance(error, EngineFailure):
+                    telemetry.add(None, error.metrics)
+                print(f"{white['name']} (White) vs. {black['name']} (Black): {error}; restarting and replaying the game.", flush=True)
+            try:
+                runPairedMatch(submit, engines[0], engines[1], sprt, args.max_pairs, args.concurrency, counted, book, scheduler, replayed,
+                               args.retries)
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        pgn_writer.close()
+        log_writer.close()
+        telemetry.export()
+        store.close()
+    results["sprt"] = {"llr": sprt.llr(), "decision": sprt.decision(), "pentanomial": sprt.pentanomial, "elo": sprt.elo()}
+    with open(args.results, "w") as f:
+        json.dump(results, f, indent=4)
+    print(telemetry.format() + sprt.status())
+    return 0
+
+def metricsPrefix(args):
+    return args.metrics or os.path.splitext(os.path.abspath(args.pgn))[0]
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description="Run a tournament without the GUI.")
+    parser.add_argument("--config", default=getConfigPath(), help="engine list (config.json)")
+    parser.add_argument("--engines", nargs="*", help="engine names to use (default: all)")
+    parser.add_argument("--movetime", type=float, default=1.0, help="time per move in seconds")
+    parser.add_argument("--tc", help="clock time control as [moves/]base+inc in seconds, e.g. 40/60+0.6 or 10+0.1")
+    parser.add_argument("--margin", type=int, default=0, help="time forfeit margin in milliseconds")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--format", choices=FORMATS, default="roundrobin",
+                        help="tournament format; gauntlet pits the first engine (in --engines order) against the rest")
+    parser.add_argument("--sprt", help="play an SPRT match between the first two engines with Elo bounds elo0,elo1")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-pairs", type=int, default=20000, help="stop the SPRT match after this many game pairs")
+    parser.add_argument("--concurrency", type=int, default=os.cpu_count() or 1, help="games played in parallel")
+    parser.add_argument("--asyncio", action="store_true", help="play all games on one asyncio event loop instead of a process pool")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="coordinate the tournament and let distributed.py workers connecting here play the games")
+    parser.add_argument("--cores", type=int, default=0, help="cores available to engines; games are admitted by their Threads settings (default: all)")
+    parser.add_argument("--memory", type=int, help="memory in MB available for engine hash tables (default: available RAM)")
+    parser.add_argument("--no-schedule", action="store_true", help="ignore engine Threads/Hash settings and run --concurrency games at once")
+    parser.add_argument("--pin", action="store_true", help="pin each engine to its own cores (Linux)")
+    parser.add_argument("--openings", help="opening suite (EPD or PGN); each opening is played with both colours")
+    parser.add_argument("--openings-order", choices=["sequential", "random"], default="sequential")
+    parser.add_argument("--book-seed", type=int, default=0, help="seed for the random opening order")
+    parser.add_argument("--capture", choices=CAPTURE_LEVELS, default="off",
+                        help="engine output kept per move; full streams all engine I/O to gzipped per-game logs next to the PGN")
+    parser.add_argument("--pgn", default="tournament.pgn", help="PGN output file")
+    parser.add_argument("--log", default="tournament.log", help="game log output file")
+    parser.add_argument("--results", default="results.json", help="results output file")
+    parser.add_argument("--db", help="SQLite results database shared by all tournaments (default: results.sqlite in the tournaments folder)")
+    parser.add_argument("--metrics", help="path prefix for the -metrics.csv/.json/.prom engine telemetry files (default: next to the PGN)")
+    parser.add_argument("--resign", help="resign adjudication as moves,score: both engines beyond score cp for that many moves")
+    parser.add_argument("--draw", help="draw adjudication as movenumber,moves,score: after movenumber, score within cp for that many moves")
+    parser.add_argument("--retries", type=int, default=2, help="times a game is replayed after an engine crash or hang before it is forfeited")
+    parser.add_argument("--no-resume", action="store_true", help="start over instead of resuming an interrupted run")
+    parser.add_argument("--sync-every", type=int, default=8, help="fsync the PGN and log files every N games")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    engines = loadEngineConfigs(args.config)
+    if args.engines:
+        engines = sorted((e for e in engines if e.get("name") in args.engines), key=lambda e: args.engines.index(e["name"]))
+    if len(engines) < 2:
+        print("Please select at least two engines!", file=sys.stderr)
+        return 1
+    tc = TimeControl.parse(args.tc, args.margin) if args.tc else TimeControl(movetime=args.movetime)
+    adjudication = Adjudication()
+    if args.resign:
+        adjudication.resign_moves, adjudication.resign_score = [int(x) for x in args.resign.split(",")]
+    if args.draw:
+        adjudication.draw_after, adjudication.draw_moves, adjudication.draw_score = [int(x) for x in args.draw.split(",")]
+    book = None
+    if args.openings:
+        try:
+            book = OpeningBook(args.openings, args.openings_order, args.book_seed)
+        except (OSError, ValueError) as e:
+            print(f"Could not open the opening suite: {e}", file=sys.stderr)
+            return 1
+    capture_dir = captureDir(os.path.abspath(args.pgn)) if args.capture == "full" else None
+    scheduler = None if args.no_schedule else ResourceScheduler(args.cores, args.memory, args.pin)
+    if args.serve and (args.sprt or args.capture == "full"):
+        print("--serve cannot be combined with --sprt or --capture full!", file=sys.stderr)
+        return 1
+    if args.sprt:
+        return runMatch(args, engines, tc, adjudication, book, capture_dir, scheduler)
+    games = makeFormat(args.format, engines, args.rounds, book)
+    total_games = games.total()
+    params = scheduleParams(engines, args.rounds, tc, EVENT, book, args.format)
+    journal = TournamentJournal.open(os.path.dirname(os.path.abspath(args.pgn)), params, total_games, os.path.abspath(args.pgn), not args.no_resume)
+    games.completed = journal.completed
+    games.max_retries = args.retries
+    results = {}
+    for record in journal.completed.values():
+        addResult(results, record["white"], record["black"], record["result"])
+    if journal.resumed():
+        print(f"Resuming tournament: {len(journal.completed)}/{total_games} games already played.", flush=True)
+    game_index = len(journal.completed)
+    telemetry = Telemetry(metricsPrefix(args), append=journal.resumed())
+    pgn_writer = GameFileWriter(journal.output_path, args.sync_every, append=journal.resumed())
+    log_writer = GameFileWriter(args.log, args.sync_every, append=journal.resumed())
+    store = ResultStore(args.db)
+    tournament_id = store.tournament(params, journal.resumed())
+    store.restore(tournament_id, journal.completed)
+    def finished(game, outcome, error=None):
+        nonlocal game_index
+        game_id, white, black = game[:3]
+        if error:
+            outcome = failedGame(error, games.retry(game))
+            if outcome is None:
+                if isinstance(error, EngineFailure):
+                    telemetry.add(None, error.metrics)
+                print(f"{white['name']} (White) vs. {black['name']} (Black): {error}; restarting and replaying the game.", flush=True)
+                return None
+        game_log, result, pgn_text, metrics = outcome
+        if pgn_text:
+            pgn_writer.write(pgn_text)
+        if not error or isinstance(error, EngineFailure):
+            journal.record(game_id, white['name'], black['name'], result)
+            store.add(tournament_id, game_id+1, game[3], white, black, tc, game[4], result, pgn_text, metrics)
+        game_index += 1
+        header = f"Game {game_index}/{total_games}: {white['name']} (White) vs. {black['name']} (Black)"
+        log_writer.write(f"{header}\n{game_log}\nResult: {result}")
+        telemetry.add(game_index, metrics)
+        addResult(results, white['name'], black['name'], result)
+        print(f"{header}: {result}", flush=True)
+        return result
+    try:
+        if args.serve:
+            Coordinator(games, parseAddress(args.serve, "0.0.0.0"), tc, adjudication, lambda round_number: gameHeaders(EVENT, round_number, tc),
+                        finished, args.capture).run()
+        elif args.asyncio:
+            runAsync(games, tc, adjudication, args.concurrency, finished, capture_dir, scheduler)
+        else:
+            runProcessPool(games, tc, adjudication, args.concurrency, finished, args.capture, capture_dir, scheduler)
+    finally:
+        pgn_writer.close()
+        log_writer.close()
+        telemetry.export()
+        store.close()
+        if len(journal.completed) == total_games:
+            journal.finish()
+        else:
+            journal.close()
+    with open(args.results, "w") as f:
+        json.dump(results, f, indent=4)
+    print(formatSummary(results))
+    print(telemetry.format())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
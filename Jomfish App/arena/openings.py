@@ -0,0 +1,64 @@
+import io, re, mmap, random
+from array import array
+import chess, chess.pgn
+
+class Opening:
+    __slots__ = ("fen", "moves", "name")
+    def __init__(self, fen, moves, name):
+        self.fen = fen
+        self.moves = moves
+        self.name = name
+    def __getstate__(self):
+        return self.fen, self.moves, self.name
+    def __setstate__(self, state):
+        self.fen, self.moves, self.name = state
+    def board(self):
+        board = chess.Board(self.fen)
+        for uci in self.moves:
+            board.push_uci(uci)
+        return board
+
+class OpeningBook:
+    def __init__(self, path, order="sequential", seed=0):
+        self.path = path
+        self.order = order
+        self.seed = seed
+        self.is_pgn = path.lower().endswith(".pgn")
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        pattern = rb"(?m)^\[Event " if self.is_pgn else rb"(?m)^(?=[^\s#])"
+        self.offsets = array("q", (m.start() for m in re.finditer(pattern, self.data)))
+        if not self.offsets:
+            raise ValueError(f"No openings found in {path}")
+        self.sequence = None
+        if order == "random":
+            self.sequence = array("q", range(len(self.offsets)))
+            random.Random(seed).shuffle(self.sequence)
+    def __len__(self):
+        return len(self.offsets)
+    def entry(self, index):
+        start = self.offsets[index]
+        if self.is_pgn:
+            end = self.offsets[index+1] if index+1 < len(self.offsets) else len(self.data)
+        else:
+            end = self.data.find(b"\n", start)
+            end = len(self.data) if end < 0 else end
+        return self.data[start:end].decode(errors="replace")
+    def opening(self, index):
+        text = self.entry(index)
+        if self.is_pgn:
+            game = chess.pgn.read_game(io.StringIO(text))
+            moves = [move.uci() for move in game.mainline_moves()]
+            name = game.headers.get("Opening") or game.headers.get("ECO") or game.board().variation_san(list(game.mainline_moves()))
+            return Opening(game.board().fen(), moves, name)
+        board, ops = chess.Board.from_epd(text.strip())
+        name = ops.get("id") or ops.get("c0") or board.fen()
+        return Opening(board.fen(), [], str(name))
+    def pick(self, number):
+        index = number % len(self.offsets)
+        if self.sequence is not None:
+            index = self.sequence[index]
+        return self.opening(index)
+    def close(self):
+        self.data.close()
+        self.file.close()
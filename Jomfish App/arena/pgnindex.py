@@ -0,0 +1,86 @@
+import io, os, re, json, mmap
+from array import array
+import chess.pgn
+
+INDEX_VERSION = 1
+INDEX_FIELDS = ["White", "Black", "Result", "Event", "Round", "Date"]
+GAME_PATTERN = re.compile(rb"(?m)^\[Event ")
+TAG_PATTERN = re.compile(rb'(?m)^\[(\w+)\s+"((?:[^"\\\r\n]|\\.)*)"\]')
+HEADER_END = re.compile(rb"\r?\n[ \t]*\r?\n")
+PROGRESS_EVERY = 20000
+
+def indexPath(path):
+    return path + ".idx"
+
+class PGNIndex:
+    def __init__(self, path, progress=None):
+        self.path = path
+        self.file = open(path, "rb")
+        st = os.fstat(self.file.fileno())
+        self.size = st.st_size
+        self.stamp = [st.st_size, st.st_mtime_ns]
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self.offsets = array("q")
+        self.headers = []
+        self.cached = self.load()
+        if self.cached != "full":
+            self.scan(self.offsets.pop() if self.offsets else 0, progress)
+            self.save()
+    def __len__(self):
+        return len(self.offsets)
+    def load(self):
+        try:
+            with open(indexPath(self.path), "r") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cache.get("version") != INDEX_VERSION or cache.get("fields") != INDEX_FIELDS:
+            return None
+        games = cache.get("games", [])
+        if cache.get("stamp") == self.stamp:
+            self.offsets = array("q", (game[0] for game in games))
+            self.headers = [game[1:] for game in games]
+            return "full"
+        size = cache.get("stamp", [0])[0]
+        if games and size <= self.size and self.data[games[-1][0]:games[-1][0]+7] == b"[Event ":
+            self.offsets = array("q", (game[0] for game in games))
+            self.headers = [game[1:] for game in games[:-1]]
+            return "partial"
+        return None
+    def save(self):
+        tmp_path = indexPath(self.path) + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "fields": INDEX_FIELDS, "stamp": self.stamp,
+                           "games": [[offset] + headers for offset, headers in zip(self.offsets, self.headers)]}, f, separators=(",", ":"))
+            os.replace(tmp_path, indexPath(self.path))
+        except OSError:
+            pass
+    def scan(self, start, progress=None):
+        for m in GAME_PATTERN.finditer(self.data, start):
+            offset = m.start()
+            end = HEADER_END.search(self.data, offset)
+            tags = {name.decode(errors="replace"): value.decode(errors="replace")
+                    for name, value in (t.groups() for t in TAG_PATTERN.finditer(self.data, offset, end.start() if end else self.size))}
+            self.offsets.append(offset)
+            self.headers.append([tags.get(field, "?") for field in INDEX_FIELDS])
+            if progress and len(self.offsets) % PROGRESS_EVERY == 0:
+                progress(len(self.offsets), offset / self.size)
+    def filter(self, text):
+        words = text.lower().split()
+        if not words:
+            return array("q", range(len(self.offsets)))
+        matches = array("q")
+        for index, headers in enumerate(self.headers):
+            line = " ".join(headers).lower()
+            if all(word in line for word in words):
+                matches.append(index)
+        return matches
+    def game(self, index):
+        start = self.offsets[index]
+        end = self.offsets[index+1] if index+1 < len(self.offsets) else self.size
+        return chess.pgn.read_game(io.StringIO(self.data[start:end].decode(errors="replace")))
+    def close(self):
+        if self.size:
+            self.data.close()
+        self.file.close()
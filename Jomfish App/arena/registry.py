@@ -0,0 +1,109 @@
+import os, json, copy, shutil
+from uci import UCIEngineParser, commandArgs
+
+def getConfigPath():
+    return os.path.join(os.getenv("APPDATA") or os.path.expanduser("~/.config"), "Jomfish", "config.json")
+
+def fileStamp(path):
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+def writeJSON(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def commandFiles(command, working_dir=""):
+    files = []
+    for index, arg in enumerate(commandArgs(command)):
+        path = os.path.join(working_dir, arg) if working_dir and not os.path.isabs(arg) else arg
+        if not os.path.isfile(path):
+            path = shutil.which(arg) if index == 0 else None
+        if path:
+            files.append(os.path.realpath(path))
+        elif index == 0:
+            return []
+    return files
+
+class EngineRegistry:
+    def __init__(self, path=None):
+        self.path = path or getConfigPath()
+        self.cache_path = os.path.join(os.path.dirname(self.path), "options-cache.json")
+        self.stamp = None
+        self.engine_list = []
+        self.option_cache = None
+    def ensure(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if not os.path.exists(self.path):
+            fixed_engine_path = os.path.join(os.getcwd(), "jomfish_none.exe")
+            self.write([{"name": "Jomfish 10", "command": fixed_engine_path, "protocol": "uci",
+                         "workingDirectory": os.path.dirname(fixed_engine_path), "initStrings": []}])
+        return self.path
+    def engines(self):
+        stamp = fileStamp(self.path)
+        if stamp is None:
+            raise FileNotFoundError(f"No engine list at {self.path}")
+        if stamp != self.stamp:
+            with open(self.path, "r") as f:
+                self.engine_list = json.load(f)
+            self.stamp = stamp
+        return copy.deepcopy(self.engine_list)
+    def engine(self, name):
+        return next((e for e in self.engines() if e.get("name") == name), None)
+    def write(self, engines):
+        writeJSON(self.path, engines)
+        self.engine_list = copy.deepcopy(engines)
+        self.stamp = fileStamp(self.path)
+    def save(self, engine):
+        self.ensure()
+        engines = [e for e in self.engines() if e.get("name") != engine["name"]]
+        engines.append(engine)
+        self.write(engines)
+    def remove(self, name):
+        self.write([e for e in self.engines() if e.get("name") != name])
+    def optionCache(self):
+        if self.option_cache is None:
+            try:
+                with open(self.cache_path, "r") as f:
+                    self.option_cache = json.load(f)
+            except (OSError, ValueError):
+                self.option_cache = {}
+        return self.option_cache
+    def cachedOptions(self, command, working_dir=""):
+        files = commandFiles(command, working_dir)
+        entry = self.optionCache().get("\0".join(files)) if files else None
+        if entry and entry["stamp"] == [fileStamp(path) for path in files]:
+            return copy.deepcopy(entry["options"])
+        return None
+    def options(self, command, working_dir="", refresh=False, timeout=5000):
+        options = None if refresh else self.cachedOptions(command, working_dir)
+        if options is not None:
+            return options
+        options = UCIEngineParser(command, working_dir).load_options(timeout)
+        files = commandFiles(command, working_dir)
+        if files and options:
+            cache = self.optionCache()
+            cache["\0".join(files)] = {"stamp": [fileStamp(path) for path in files], "options": copy.deepcopy(options)}
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            writeJSON(self.cache_path, cache)
+        return options
+
+registries = {}
+
+def engineRegistry(path=None):
+    path = os.path.realpath(path or getConfigPath())
+    if path not in registries:
+        registries[path] = EngineRegistry(path)
+    return registries[path]
+
+def ensureConfigDir():
+    return engineRegistry().ensure()
+
+def loadEngineConfigs(path=None):
+    return engineRegistry(path).engines()
@@ -0,0 +1,200 @@
+import os, re, sys, json, math, time, sqlite3, hashlib, argparse
+from sprt import scoreToElo
+from tournament import outputDir, scheduleKey
+
+BATCH_SIZE = 32
+FLUSH_INTERVAL = 2.0
+ELO_ITERATIONS = 1000
+ELO_PRIOR = 0.5
+TERMINATION_PATTERN = re.compile(r'\[Termination "([^"]*)"\]')
+PLY_COUNT_PATTERN = re.compile(r'\[PlyCount "(\d+)"\]')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tournaments (
+    id INTEGER PRIMARY KEY, key TEXT NOT NULL, event TEXT, format TEXT, tc TEXT, params TEXT, started REAL);
+CREATE INDEX IF NOT EXISTS tournaments_key ON tournaments (key);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY, tournament INTEGER NOT NULL REFERENCES tournaments (id), game INTEGER NOT NULL, round INTEGER,
+    white TEXT NOT NULL, black TEXT NOT NULL, white_options TEXT, black_options TEXT, tc TEXT, opening TEXT,
+    result TEXT NOT NULL, plies INTEGER, termination TEXT, white_time REAL, black_time REAL, played REAL,
+    UNIQUE (tournament, game));
+CREATE INDEX IF NOT EXISTS games_tournament ON games (tournament, white, black, result);
+CREATE INDEX IF NOT EXISTS games_white ON games (white, black, result);
+CREATE INDEX IF NOT EXISTS games_black ON games (black, white, result);
+"""
+
+def resultsPath():
+    return os.path.join(outputDir(), "results.sqlite")
+
+def optionsHash(config):
+    data = json.dumps([config.get("command", ""), config.get("initStrings", [])])
+    return hashlib.sha1(data.encode()).hexdigest()[:16]
+
+def termination(result, pgn_text):
+    m = TERMINATION_PATTERN.search(pgn_text or "")
+    if m:
+        return m.group(1)
+    return "unterminated" if result == "Abort" else "normal"
+
+def plyCount(pgn_text):
+    m = PLY_COUNT_PATTERN.search(pgn_text or "")
+    return int(m.group(1)) if m else None
+
+class ResultStore:
+    def __init__(self, path=None, batch_size=BATCH_SIZE, interval=FLUSH_INTERVAL):
+        self.path = path or resultsPath()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.pending = []
+        self.flushed = time.monotonic()
+    def tournament(self, params, resume=False):
+        key = scheduleKey(params)
+        if resume:
+            row = self.connection.execute("SELECT id FROM tournaments WHERE key = ? ORDER BY id DESC LIMIT 1", (key,)).fetchone()
+            if row:
+                return row[0]
+        with self.connection:
+            cursor = self.connection.execute("INSERT INTO tournaments (key, event, format, tc, params, started) VALUES (?, ?, ?, ?, ?, ?)",
+                                             (key, params.get("event"), params.get("format", "roundrobin"), params.get("tc"),
+                                              json.dumps(params), time.time()))
+        return cursor.lastrowid
+    def restore(self, tournament, completed):
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO games (tournament, game, white, black, result, played) VALUES (?, ?, ?, ?, ?, ?)",
+                                        [(tournament, game_id + 1, record["white"], record["black"], record["result"], time.time())
+                                         for game_id, record in completed.items()])
+    def add(self, tournament, game_number, round_number, white, black, tc, opening, result, pgn_text, metrics):
+        times = [round(m.think.total, 3) for m in metrics] if metrics else [None, None]
+        self.pending.append((tournament, game_number, round_number, white["name"], black["name"], optionsHash(white), optionsHash(black),
+                             str(tc), opening.name if opening else None, result,
+                             plyCount(pgn_text), termination(result, pgn_text),
+                             times[0], times[1], time.time()))
+        if len(self.pending) >= self.batch_size or time.monotonic() - self.flushed >= self.interval:
+            self.flush()
+            return True
+        return False
+    def flush(self):
+        self.flushed = time.monotonic()
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO games (tournament, game, round, white, black, white_options, black_options, tc,"
+                                        " opening, result, plies, termination, white_time, black_time, played)"
+                                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+        self.pending = []
+    def close(self):
+        self.flush()
+        self.connection.close()
+    def tournaments(self):
+        return self.connection.execute("SELECT t.id, t.event, t.format, t.tc, t.started, COUNT(g.id) FROM tournaments t"
+                                       " LEFT JOIN games g ON g.tournament = t.id GROUP BY t.id ORDER BY t.id").fetchall()
+    def pairings(self, tournaments=None, engines=None):
+        self.flush()
+        where, params = ["result IN ('1-0', '0-1', '1/2-1/2')"], []
+        if tournaments:
+            where.append(f"tournament IN ({', '.join('?' * len(tournaments))})")
+            params += tournaments
+        if engines:
+            marks = ", ".join("?" * len(engines))
+            where.append(f"white IN ({marks}) AND black IN ({marks})")
+            params += list(engines) * 2
+        return self.connection.execute("SELECT white, black, SUM(result = '1-0'), SUM(result = '0-1'), COUNT(*) FROM games"
+                                       + " WHERE " + " AND ".join(where) + " GROUP BY white, black", params).fetchall()
+    def crosstable(self, tournaments=None, engines=None):
+        table = {}
+        for white, black, wins, losses, games in self.pairings(tournaments, engines):
+            for name, opponent, won, lost in ((white, black, wins, losses), (black, white, losses, wins)):
+                entry = table.setdefault(name, {}).setdefault(opponent, [0, 0, 0])
+                entry[0] += won
+                entry[1] += games - won - lost
+                entry[2] += lost
+        return table
+    def headToHead(self, engine_a, engine_b, tournaments=None):
+        return self.crosstable(tournaments, [engine_a, engine_b]).get(engine_a, {}).get(engine_b, [0, 0, 0])
+    def standings(self, tournaments=None, engines=None):
+        table = self.crosstable(tournaments, engines)
+        ratings = eloRatings(table)
+        rows = []
+        for name, opponents in table.items():
+            wins, draws, losses = [sum(entry[i] for entry in opponents.values()) for i in range(3)]
+            rows.append({"engine": name, "games": wins + draws + losses, "points": wins + draws / 2, "wins": wins, "draws": draws,
+                         "losses": losses, "elo": ratings[name]})
+        return sorted(rows, key=lambda row: (-row["points"], -row["elo"], row["engine"]))
+
+def eloRatings(table):
+    gamma = {name: 1.0 for name in table}
+    for _ in range(ELO_ITERATIONS):
+        updated = {}
+        for name, opponents in table.items():
+            points = sum(w + d / 2 + ELO_PRIOR for w, d, l in opponents.values())
+            expected = sum((w + d + l + 2 * ELO_PRIOR) / (gamma[name] + gamma[opponent]) for opponent, (w, d, l) in opponents.items())
+            updated[name] = points / expected if expected else 1.0
+        scale = math.exp(sum(math.log(value) for value in updated.values()) / len(updated)) if updated else 1.0
+        updated = {name: value / scale for name, value in updated.items()}
+        change = max((abs(math.log(updated[name] / gamma[name])) for name in table), default=0.0)
+        gamma = updated
+        if change < 1e-9:
+            break
+    return {name: 400 * math.log10(value) for name, value in gamma.items()}
+
+def formatStandings(rows):
+    lines = [f"{'#':>3} {'Engine':<24} {'Games':>6} {'Points':>7} {'Score':>6} {'W':>5} {'D':>5} {'L':>5} {'Elo':>7}"]
+    for rank, row in enumerate(rows, 1):
+        score = 100 * row["points"] / row["games"] if row["games"] else 0.0
+        lines.append(f"{rank:>3} {row['engine']:<24} {row['games']:>6} {row['points']:>7g} {score:>5.1f}% {row['wins']:>5} {row['draws']:>5}"
+                     f" {row['losses']:>5} {row['elo']:>+7.1f}")
+    return "\n".join(lines) + "\n"
+
+def formatCrosstable(table):
+    names = sorted(table, key=lambda name: -sum(w + d / 2 for w, d, l in table[name].values()))
+    width = max([len(name) for name in names] + [6])
+    lines = [" " * width + "".join(f" {name[:9]:>9}" for name in names)]
+    for name in names:
+        cells = []
+        for opponent in names:
+            entry = table[name].get(opponent)
+            cells.append(f" {'-' if opponent == name else (f'{entry[0] + entry[1] / 2:g}/{sum(entry)}' if entry else ''):>9}")
+        lines.append(f"{name:<{width}}" + "".join(cells))
+    return "\n".join(lines) + "\n"
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(description="Query the results database written by tournaments and matches.")
+    parser.add_argument("--db", default=None, help="results database (default: results.sqlite in the tournaments folder)")
+    parser.add_argument("--tournament", type=int, action="append", help="restrict to this tournament id; repeat for several (default: all)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("tournaments", help="list recorded tournaments")
+    standings = commands.add_parser("standings", help="points and Elo of every engine")
+    standings.add_argument("engines", nargs="*", help="only count games among these engines")
+    crosstable = commands.add_parser("crosstable", help="score of every engine against every opponent")
+    crosstable.add_argument("engines", nargs="*", help="only count games among these engines")
+    h2h = commands.add_parser("h2h", help="head-to-head score of two engines")
+    h2h.add_argument("engine_a")
+    h2h.add_argument("engine_b")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parseArgs(argv)
+    store = ResultStore(args.db)
+    try:
+        if args.command == "tournaments":
+            for tournament_id, event, schedule, tc, started, games in store.tournaments():
+                print(f"{tournament_id:>5} {time.strftime('%Y-%m-%d %H:%M', time.localtime(started))} {event} ({schedule}, {tc}): {games} games")
+        elif args.command == "standings":
+            print(formatStandings(store.standings(args.tournament, args.engines)), end="")
+        elif args.command == "crosstable":
+            print(formatCrosstable(store.crosstable(args.tournament, args.engines)), end="")
+        else:
+            wins, draws, losses = store.headToHead(args.engine_a, args.engine_b, args.tournament)
+            games = wins + draws + losses
+            elo = scoreToElo((wins + draws / 2) / games) if games else 0.0
+            print(f"{args.engine_a} vs. {args.engine_b}: +{wins} ={draws} -{losses} ({wins + draws / 2:g}/{games}, Elo {elo:+.1f})")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import os, re, concurrent.futures
+from formats import GameSource
+
+DEFAULT_THREADS = 1
+DEFAULT_HASH_MB = 16
+
+def engineResources(config):
+    threads, hash_mb = DEFAULT_THREADS, DEFAULT_HASH_MB
+    for cmd in config.get("initStrings", []):
+        m = re.match(r"\s*setoption\s+name\s+(.+?)\s+value\s+(\S+)", cmd, re.IGNORECASE)
+        if not m:
+            continue
+        try:
+            if m.group(1).lower() == "threads":
+                threads = max(1, int(m.group(2)))
+            elif m.group(1).lower() == "hash":
+                hash_mb = max(0, int(m.group(2)))
+        except ValueError:
+            pass
+    return threads, hash_mb
+
+def availableCores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def availableMemoryMB():
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def pinProcess(process, cores):
+    if not cores or process is None or not hasattr(os, "sched_setaffinity"):
+        return
+    try:
+        tasks = [int(tid) for tid in os.listdir(f"/proc/{process.pid}/task")]
+    except OSError:
+        tasks = [process.pid]
+    for tid in tasks:
+        try:
+            os.sched_setaffinity(tid, cores)
+        except OSError:
+            pass
+
+class ResourceScheduler:
+    def __init__(self, cores=0, memory_mb=None, pin=False):
+        self.cores = availableCores()
+        if cores:
+            self.cores = self.cores[:cores]
+        self.free_cores = set(self.cores)
+        self.memory_mb = availableMemoryMB() if memory_mb is None else memory_mb
+        self.used_mb = 0
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+    def allocate(self, white_config, black_config, force=False):
+        (white_threads, white_hash), (black_threads, black_hash) = engineResources(white_config), engineResources(black_config)
+        memory = white_hash + black_hash
+        if not force:
+            if white_threads + black_threads > len(self.free_cores):
+                return None
+            if self.memory_mb is not None and self.used_mb + memory > self.memory_mb:
+                return None
+        free = sorted(self.free_cores)
+        white_cores = free[:white_threads]
+        black_cores = free[len(white_cores):len(white_cores) + black_threads]
+        taken = white_cores + black_cores
+        self.free_cores.difference_update(taken)
+        self.used_mb += memory
+        return (white_cores or self.cores, black_cores or self.cores), taken, memory
+    def release(self, allocation):
+        if allocation:
+            _, taken, memory = allocation
+            self.free_cores.update(taken)
+            self.used_mb -= memory
+    def pinning(self, allocation):
+        return allocation[0] if self.pin and allocation else None
+
+def runScheduled(games, submit, finished, concurrency, scheduler=None):
+    source = games if isinstance(games, GameSource) else GameSource(games)
+    in_flight = {}
+    while True:
+        while len(in_flight) < concurrency:
+            candidates = source.candidates()
+            if not candidates:
+                break
+            index, allocation = 0, None
+            if scheduler:
+                for index, game in enumerate(candidates):
+                    allocation = scheduler.allocate(game[1], game[2], force=not in_flight)
+                    if allocation:
+                        break
+                if not allocation:
+                    break
+            game = candidates[index]
+            source.take(game)
+            in_flight[submit(game, scheduler.pinning(allocation) if scheduler else None)] = (game, allocation)
+        if not in_flight:
+            break
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            game, allocation = in_flight.pop(future)
+            if scheduler:
+                scheduler.release(allocation)
+            result = finished(game, future)
+            if result is not None:
+                source.finish(game, result)
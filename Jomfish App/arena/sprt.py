@@ -0,0 +1,119 @@
+import math, concurrent.futures
+from formats import MAX_RETRIES
+from tournament import failedGame
+
+def eloToScore(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def scoreToElo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def gameScore(result, white_is_a):
+    if result == "1-0":
+        return 1.0 if white_is_a else 0.0
+    if result == "0-1":
+        return 0.0 if white_is_a else 1.0
+    return 0.5 if result == "1/2-1/2" else None
+
+class SPRT:
+    def __init__(self, elo0=0.0, elo1=5.0, alpha=0.05, beta=0.05):
+        self.elo0 = elo0
+        self.elo1 = elo1
+        self.alpha = alpha
+        self.beta = beta
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.pentanomial = [0, 0, 0, 0, 0]
+    def addPair(self, pair_score):
+        self.pentanomial[int(round(pair_score * 2))] += 1
+    def pairs(self):
+        return sum(self.pentanomial)
+    def stats(self):
+        counts = [count + 0.5 for count in self.pentanomial]
+        n = sum(counts)
+        mean = sum(count * i / 4 for i, count in enumerate(counts)) / n
+        var = sum(count * (i / 4 - mean) ** 2 for i, count in enumerate(counts)) / n
+        return mean, var
+    def llr(self):
+        mean, var = self.stats()
+        if var <= 0:
+            return 0.0
+        s0, s1 = eloToScore(self.elo0), eloToScore(self.elo1)
+        return self.pairs() * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+    def decision(self):
+        llr = self.llr()
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+    def elo(self):
+        mean, var = self.stats()
+        n = self.pairs()
+        if n < 2:
+            return scoreToElo(mean), 0.0
+        error = 1.96 * math.sqrt(var / n)
+        return scoreToElo(mean), (scoreToElo(min(mean + error, 1)) - scoreToElo(max(mean - error, 0))) / 2
+    def status(self):
+        elo, error = self.elo()
+        decision = {"H1": "H1 accepted", "H0": "H0 accepted", None: "running"}[self.decision()]
+        return (f"SPRT [{self.elo0:g}, {self.elo1:g}] LLR {self.llr():.2f} ({self.lower:.2f}, {self.upper:.2f}) {decision} | "
+                f"Elo {elo:+.1f} +/- {error:.1f} | Pairs {self.pairs()} | Ptnml {self.pentanomial}")
+
+def runPairedMatch(submit, engine_a, engine_b, sprt, max_pairs, concurrency, finished, book=None, scheduler=None, replayed=None,
+                   max_retries=MAX_RETRIES):
+    in_flight = {}
+    attempts = {}
+    pair_scores = {}
+    queued = []
+    next_pair = 0
+    while True:
+        while len(in_flight) < concurrency:
+            if not queued:
+                if next_pair >= max_pairs or sprt.decision() is not None:
+                    break
+                opening = book.pick(next_pair) if book else None
+                queued = [(next_pair, engine_a, engine_b, True, opening), (next_pair, engine_b, engine_a, False, opening)]
+                next_pair += 1
+            pair_index, white, black, white_is_a, opening = queued[0]
+            allocation = scheduler.allocate(white, black, force=not in_flight) if scheduler else None
+            if scheduler and not allocation:
+                break
+            entry = queued.pop(0)
+            future = submit(white, black, pair_index + 1, opening, scheduler.pinning(allocation) if scheduler else None)
+            in_flight[future] = (entry, allocation)
+        if not in_flight:
+            break
+        done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            entry, allocation = in_flight.pop(future)
+            pair_index, white, black, white_is_a, _ = entry
+            if scheduler:
+                scheduler.release(allocation)
+            try:
+                outcome = future.result()
+            except Exception as error:
+                key = (pair_index, white_is_a)
+                retry = attempts.get(key, 0) < max_retries
+                outcome = failedGame(error, retry)
+                if outcome is None:
+                    attempts[key] = attempts.get(key, 0) + 1
+                    queued.insert(0, entry)
+                    if replayed:
+                        replayed(white, black, error)
+                    continue
+            finished(white, black, outcome, pair_index + 1, entry[4])
+            pair_scores.setdefault(pair_index, []).append(gameScore(outcome[1], white_is_a))
+            if len(pair_scores[pair_index]) == 2:
+                scores = pair_scores.pop(pair_index)
+                if None not in scores and sprt.decision() is None:
+                    sprt.addPair(sum(scores))
+        if sprt.decision() is not None:
+            queued = []
+            for future in list(in_flight):
+                if future.cancel():
+                    _, allocation = in_flight.pop(future)
+                    if scheduler:
+                        scheduler.release(allocation)
+    return sprt.decision()
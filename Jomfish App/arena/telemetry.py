@@ -0,0 +1,176 @@
+import os, csv, json, math, time, random
+from array import array
+
+SUMMARY_FIELDS = ["engine", "games", "moves", "uciok_ms", "think_ms_avg", "think_ms_p99", "overrun_ms_avg", "overrun_ms_p99",
+                  "depth_avg", "depth_p99", "nps_avg", "nps_p99", "timeouts", "time_losses", "illegal_moves", "crashes", "hangs"]
+GAME_FIELDS = ["game", "color"] + SUMMARY_FIELDS
+RESERVOIR_SIZE = 4096
+EXPORT_INTERVAL = 5.0
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def scaled(value, factor):
+    return None if value is None else round(value * factor, 3)
+
+class Samples:
+    def __init__(self, typecode="d", size=RESERVOIR_SIZE):
+        self.values = array(typecode)
+        self.size = size
+        self.count = 0
+        self.total = 0
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.values[index] = value
+    def merge(self, other):
+        count, total = self.count + other.count, self.total + other.total
+        for value in other.values:
+            self.add(value)
+        self.count, self.total = count, total
+    def mean(self):
+        return self.total / self.count if self.count else None
+    def percentile(self, fraction):
+        return percentile(self.values, fraction)
+    def state(self):
+        return {"count": self.count, "total": self.total, "values": self.values.tolist()}
+    @classmethod
+    def fromState(cls, typecode, state):
+        samples = cls(typecode)
+        samples.values.extend(state["values"])
+        samples.count = state["count"]
+        samples.total = state["total"]
+        return samples
+
+class EngineMetrics:
+    def __init__(self, name, startup_latency=None, games=1):
+        self.name = name
+        self.games = games
+        self.startup = Samples()
+        if startup_latency is not None:
+            self.startup.add(startup_latency)
+        self.think = Samples()
+        self.overrun = Samples()
+        self.depth = Samples("l")
+        self.nps = Samples("q")
+        self.timeouts = 0
+        self.time_losses = 0
+        self.illegal_moves = 0
+        self.crashes = 0
+        self.hangs = 0
+    def move(self, think_time, requested, info, timed_out):
+        self.think.add(think_time)
+        if requested is not None:
+            self.overrun.add(think_time - requested)
+        if info is not None:
+            if info.depth is not None:
+                self.depth.add(info.depth)
+            if info.nps is not None:
+                self.nps.add(info.nps)
+        if timed_out:
+            self.timeouts += 1
+    def merge(self, other):
+        self.games += other.games
+        for name in ("startup", "think", "overrun", "depth", "nps"):
+            getattr(self, name).merge(getattr(other, name))
+        self.timeouts += other.timeouts
+        self.time_losses += other.time_losses
+        self.illegal_moves += other.illegal_moves
+        self.crashes += other.crashes
+        self.hangs += other.hangs
+    def state(self):
+        return {name: value.state() if isinstance(value, Samples) else value for name, value in vars(self).items()}
+    @classmethod
+    def fromState(cls, state):
+        metrics = cls(state["name"], games=state["games"])
+        for name, value in state.items():
+            current = getattr(metrics, name)
+            setattr(metrics, name, Samples.fromState(current.values.typecode, value) if isinstance(current, Samples) else value)
+        return metrics
+    def summary(self):
+        return {"engine": self.name, "games": self.games, "moves": self.think.count,
+                "uciok_ms": scaled(self.startup.mean(), 1000),
+                "think_ms_avg": scaled(self.think.mean(), 1000), "think_ms_p99": scaled(self.think.percentile(0.99), 1000),
+                "overrun_ms_avg": scaled(self.overrun.mean(), 1000), "overrun_ms_p99": scaled(self.overrun.percentile(0.99), 1000),
+                "depth_avg": scaled(self.depth.mean(), 1), "depth_p99": self.depth.percentile(0.99),
+                "nps_avg": scaled(self.nps.mean(), 1), "nps_p99": self.nps.percentile(0.99),
+                "timeouts": self.timeouts, "time_losses": self.time_losses, "illegal_moves": self.illegal_moves, "crashes": self.crashes,
+                "hangs": self.hangs}
+
+def gameMetrics(white_name, white_engine, black_name, black_engine):
+    metrics = []
+    for name, engine in ((white_name, white_engine), (black_name, black_engine)):
+        metrics.append(EngineMetrics(name, engine.startup_latency))
+        engine.startup_latency = None
+    return metrics
+
+class Telemetry:
+    def __init__(self, path_prefix, append=False, interval=EXPORT_INTERVAL):
+        self.path_prefix = path_prefix
+        self.engines = {}
+        self.interval = interval
+        self.exported = time.monotonic()
+        self.games_file = open(path_prefix + "-metrics-games.csv", "a" if append else "w", newline="")
+        self.games_writer = csv.DictWriter(self.games_file, GAME_FIELDS)
+        if self.games_file.tell() == 0:
+            self.games_writer.writeheader()
+    def add(self, game_number, metrics):
+        if not metrics:
+            return
+        for color, engine_metrics in zip(("white", "black"), metrics):
+            if game_number is not None:
+                self.games_writer.writerow(dict(engine_metrics.summary(), game=game_number, color=color))
+            if engine_metrics.name not in self.engines:
+                self.engines[engine_metrics.name] = EngineMetrics(engine_metrics.name, games=0)
+            self.engines[engine_metrics.name].merge(engine_metrics)
+        self.games_file.flush()
+        if time.monotonic() - self.exported >= self.interval:
+            self.exported = time.monotonic()
+            self.writePrometheus(self.rows())
+    def rows(self):
+        return [metrics.summary() for metrics in self.engines.values()]
+    def format(self):
+        lines = ["Engine telemetry:"]
+        for row in self.rows():
+            value = lambda key, unit="": "-" if row[key] is None else f"{row[key]}{unit}"
+            lines.append(f"{row['engine']}: {row['moves']} moves | think avg {value('think_ms_avg', 'ms')} p99 {value('think_ms_p99', 'ms')}"
+                         f" | overrun avg {value('overrun_ms_avg', 'ms')} | depth avg {value('depth_avg')} | nps avg {value('nps_avg')}"
+                         f" p99 {value('nps_p99')} | uciok {value('uciok_ms', 'ms')} | timeouts {row['timeouts']} | time losses {row['time_losses']}"
+                         f" | illegal moves {row['illegal_moves']} | crashes {row['crashes']} | hangs {row['hangs']}")
+        return "\n".join(lines) + "\n"
+    def replaceFile(self, path, write):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", newline="") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    def writeCSV(self, rows):
+        def write(f):
+            writer = csv.DictWriter(f, SUMMARY_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        self.replaceFile(self.path_prefix + "-metrics.csv", write)
+    def writeJSON(self, rows):
+        self.replaceFile(self.path_prefix + "-metrics.json", lambda f: json.dump({"engines": rows}, f, indent=4))
+    def writePrometheus(self, rows):
+        def write(f):
+            for field in SUMMARY_FIELDS[1:]:
+                f.write(f"# TYPE arena_engine_{field} gauge\n")
+                for row in rows:
+                    if row[field] is not None:
+                        name = row["engine"].replace("\\", "\\\\").replace('"', '\\"')
+                        f.write(f'arena_engine_{field}{{engine="{name}"}} {row[field]}\n')
+        self.replaceFile(self.path_prefix + "-metrics.prom", write)
+    def export(self):
+        rows = self.rows()
+        self.writeCSV(rows)
+        self.writeJSON(rows)
+        self.writePrometheus(rows)
+        self.games_file.close()
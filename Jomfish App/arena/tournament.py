@@ -0,0 +1,475 @@
+import os, json, time, gzip, queue, hashlib, threading, asyncio
+import chess, chess.pgn, chess.engine
+from telemetry import gameMetrics
+from scheduler import pinProcess
+from registry import getConfigPath
+
+def outputDir():
+    d = os.path.join(os.path.dirname(getConfigPath()), "tournaments")
+    os.makedirs(d, exist_ok=True)
+    return d
+
+def defaultOutputPath(extension=".pgn"):
+    return os.path.join(outputDir(), time.strftime("tournament-%Y%m%d-%H%M%S") + extension)
+
+class GameFileWriter:
+    def __init__(self, path, batch_size=8, append=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = 0
+        self.file = open(path, "a" if append else "w")
+    def write(self, text):
+        self.file.write(text.rstrip("\n") + "\n\n")
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.sync()
+    def sync(self):
+        if self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+    def close(self):
+        self.sync()
+        self.file.close()
+
+CAPTURE_LEVELS = ("off", "bestmove", "info", "full")
+
+class CaptureWriter:
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    def run(self):
+        files = {}
+        while True:
+            path, text, done = self.queue.get()
+            if text is not None:
+                if path not in files:
+                    files[path] = gzip.open(path, "wt", encoding="utf-8")
+                files[path].write(text)
+            else:
+                f = files.pop(path, None)
+                if f:
+                    f.close()
+                done.set()
+    def write(self, path, text):
+        self.queue.put((path, text, None))
+    def finish(self, path):
+        done = threading.Event()
+        self.queue.put((path, None, done))
+        done.wait()
+
+capture_writer = None
+capture_lock = threading.Lock()
+
+def captureWriter():
+    global capture_writer
+    with capture_lock:
+        if capture_writer is None:
+            capture_writer = CaptureWriter()
+        return capture_writer
+
+def captureDir(output_path):
+    d = os.path.splitext(output_path)[0] + "-engines"
+    os.makedirs(d, exist_ok=True)
+    return d
+
+def capturePath(directory, game_number):
+    return os.path.join(directory, f"game-{game_number:05d}.log.gz")
+
+def captureIO(prefix, position, go, raw_output):
+    return f"{prefix} > {position}\n{prefix} > {go}\n" + "".join(f"{prefix} < {line}\n" for line in raw_output.split("\n"))
+
+def scheduleParams(engines, rounds, tc, event, book=None, schedule="roundrobin"):
+    params = {"event": event, "rounds": rounds, "tc": str(tc),
+              "engines": [{"name": e["name"], "command": e["command"], "initStrings": e.get("initStrings", [])} for e in engines]}
+    if schedule != "roundrobin":
+        params["format"] = schedule
+    if book:
+        params["openings"] = {"path": os.path.abspath(book.path), "order": book.order, "seed": book.seed}
+    return params
+
+def scheduleKey(params):
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+class TournamentJournal:
+    def __init__(self, path, output_path, completed):
+        self.path = path
+        self.output_path = output_path
+        self.completed = completed
+        self.file = open(path, "a")
+    @classmethod
+    def open(cls, directory, params, total, output_path, resume=True):
+        key = scheduleKey(params)
+        path = os.path.join(directory, f"tournament-{key[:16]}.journal")
+        completed = {}
+        if resume and os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("type") == "schedule" and record.get("key") == key:
+                        output_path = record["output"]
+                    elif record.get("type") == "result":
+                        completed[record["id"]] = record
+            if completed:
+                return cls(path, output_path, completed)
+        with open(path, "w") as f:
+            f.write(json.dumps({"type": "schedule", "key": key, "output": output_path, "params": params, "games": total}) + "\n")
+        return cls(path, output_path, completed)
+    def resumed(self):
+        return bool(self.completed)
+    def record(self, game_id, white_name, black_name, result):
+        record = {"type": "result", "id": game_id, "white": white_name, "black": black_name, "result": result}
+        self.completed[game_id] = record
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+    def close(self):
+        self.file.close()
+    def finish(self):
+        self.close()
+        os.replace(self.path, self.path + ".done")
+
+def addResult(results, white_name, black_name, result):
+    results.setdefault(white_name, 0)
+    results.setdefault(black_name, 0)
+    if result=="1-0":
+        results[white_name] += 1
+    elif result=="0-1":
+        results[black_name] += 1
+    elif result=="1/2-1/2":
+        results[white_name] += 0.5
+        results[black_name] += 0.5
+
+def formatSummary(results):
+    summary = "Tournament finished. Results:\n"
+    for name, score in results.items():
+        summary += f"{name}: {score} points\n"
+    return summary
+
+class TimeControl:
+    def __init__(self, movetime=None, base=0.0, inc=0.0, moves=0, margin_ms=0):
+        self.movetime = movetime
+        self.base = base
+        self.inc = inc
+        self.moves = moves
+        self.margin_ms = margin_ms
+    @classmethod
+    def parse(cls, text, margin_ms=0):
+        moves = 0
+        if "/" in text:
+            moves, text = text.split("/", 1)
+            moves = int(moves)
+        base, _, inc = text.partition("+")
+        return cls(base=float(base), inc=float(inc or 0), moves=moves, margin_ms=margin_ms)
+    def usesClock(self):
+        return self.movetime is None
+    def pgnTag(self):
+        if not self.usesClock():
+            return f"{self.movetime:g}/move"
+        return str(self)
+    def __str__(self):
+        if not self.usesClock():
+            return f"movetime {self.movetime}s"
+        text = f"{self.base:g}+{self.inc:g}"
+        return f"{self.moves}/{text}" if self.moves else text
+
+class GameClock:
+    def __init__(self, tc):
+        self.tc = tc
+        self.remaining = {chess.WHITE: tc.base, chess.BLACK: tc.base}
+        self.moves_made = {chess.WHITE: 0, chess.BLACK: 0}
+    def movesToGo(self, color):
+        return self.tc.moves - self.moves_made[color] % self.tc.moves if self.tc.moves else 0
+    def goCommand(self, color):
+        cmd = (f"go wtime {max(0, int(self.remaining[chess.WHITE]*1000))} btime {max(0, int(self.remaining[chess.BLACK]*1000))}"
+               f" winc {int(self.tc.inc*1000)} binc {int(self.tc.inc*1000)}")
+        if self.tc.moves:
+            cmd += f" movestogo {self.movesToGo(color)}"
+        return cmd
+    def timeoutMs(self, color):
+        return max(0, int(self.remaining[color]*1000)) + self.tc.margin_ms
+    def punch(self, color, elapsed):
+        self.remaining[color] -= elapsed
+        if self.remaining[color]*1000 < -self.tc.margin_ms:
+            return False
+        self.remaining[color] += self.tc.inc
+        self.moves_made[color] += 1
+        if self.tc.moves and self.moves_made[color] % self.tc.moves == 0:
+            self.remaining[color] += self.tc.base
+        return True
+    def status(self):
+        return f"clock {self.remaining[chess.WHITE]:.2f}s/{self.remaining[chess.BLACK]:.2f}s"
+
+class Adjudication:
+    def __init__(self, resign_moves=0, resign_score=600, draw_after=40, draw_moves=0, draw_score=10):
+        self.resign_moves = resign_moves
+        self.resign_score = resign_score
+        self.draw_after = draw_after
+        self.draw_moves = draw_moves
+        self.draw_score = draw_score
+    def enabled(self):
+        return self.resign_moves > 0 or self.draw_moves > 0
+
+class Adjudicator:
+    def __init__(self, rules):
+        self.rules = rules
+        self.white_streak = 0
+        self.black_streak = 0
+        self.draw_streak = 0
+    def update(self, board, color, score):
+        if score is None:
+            self.white_streak = self.black_streak = self.draw_streak = 0
+            return None, None
+        white_score = score if color == chess.WHITE else -score
+        rules = self.rules
+        if rules.resign_moves > 0:
+            self.white_streak = self.white_streak + 1 if white_score >= rules.resign_score else 0
+            self.black_streak = self.black_streak + 1 if white_score <= -rules.resign_score else 0
+            if self.white_streak >= 2 * rules.resign_moves:
+                return "1-0", f"Black resigns (both engines scored beyond {rules.resign_score} cp for {rules.resign_moves} moves)"
+            if self.black_streak >= 2 * rules.resign_moves:
+                return "0-1", f"White resigns (both engines scored beyond {rules.resign_score} cp for {rules.resign_moves} moves)"
+        if rules.draw_moves > 0 and board.fullmove_number >= rules.draw_after:
+            self.draw_streak = self.draw_streak + 1 if abs(white_score) <= rules.draw_score else 0
+            if self.draw_streak >= 2 * rules.draw_moves:
+                return "1/2-1/2", f"Draw by adjudication (score within {rules.draw_score} cp for {rules.draw_moves} moves)"
+        return None, None
+
+def adjudicate(game, node, result, reason):
+    game.headers["Termination"] = "adjudication"
+    node.comment = f"{node.comment} {reason}".strip()
+    return result
+
+def annotateMove(node, info, think_time, color):
+    node.set_emt(think_time)
+    if info is None:
+        return
+    if info.hasScore():
+        score = chess.engine.Cp(info.cp) if info.cp is not None else chess.engine.Mate(info.mate)
+        node.set_eval(chess.engine.PovScore(score, color), info.depth)
+    fields = [("seldepth", info.seldepth), ("nodes", info.nodes), ("nps", info.nps), (f"{info.bound}bound", "" if info.bound else None)]
+    text = " ".join(f"{key} {value}".strip() for key, value in fields if value is not None)
+    if text:
+        node.comment = f"{node.comment} {text}"
+
+def timeForfeit(board, game, color):
+    game.headers["Termination"] = "time forfeit"
+    if board.has_insufficient_material(not color):
+        return "1/2-1/2"
+    return "0-1" if color == chess.WHITE else "1-0"
+
+def illegalMove(game, color):
+    game.headers["Termination"] = "rules infraction"
+    return "0-1" if color == chess.WHITE else "1-0"
+
+def parseBestmove(board, bestmove):
+    if not bestmove:
+        return None, "No answer from engine.\n"
+    try:
+        move = chess.Move.from_uci(bestmove)
+    except Exception:
+        return None, f"Invalid move: {bestmove}\n"
+    if move not in board.legal_moves:
+        return None, f"Illegal move: {bestmove}\n"
+    return move, None
+
+def gameHeaders(event, round_number, tc):
+    return {"Event": event, "Date": time.strftime("%Y.%m.%d"), "Round": str(round_number), "TimeControl": tc.pgnTag()}
+
+def newGame(white_config, black_config, headers=None, opening=None):
+    game = chess.pgn.Game()
+    game.headers.update(headers or {})
+    game.headers["White"] = white_config["name"]
+    game.headers["Black"] = black_config["name"]
+    if not opening:
+        return chess.Board(), game
+    board = chess.Board(opening.fen)
+    if opening.fen != chess.STARTING_FEN:
+        game.setup(board)
+    node = game
+    for uci in opening.moves:
+        move = chess.Move.from_uci(uci)
+        board.push(move)
+        node = node.add_variation(move)
+    if opening.moves:
+        node.comment = "book"
+    game.headers["Opening"] = opening.name
+    return board, game
+
+ERROR_OUTCOME = ("Error during simulation.", "Abort", "", None)
+
+class EngineFailure(Exception):
+    def __init__(self, name, color, reason, game_log="", metrics=None, pgn_text=""):
+        super().__init__(f"{'White' if color == chess.WHITE else 'Black'} {name} {reason}")
+        self.name = name
+        self.color = color
+        self.reason = reason
+        self.game_log = game_log
+        self.metrics = metrics
+        self.pgn_text = pgn_text
+    def __reduce__(self):
+        return EngineFailure, (self.name, self.color, self.reason, self.game_log, self.metrics, self.pgn_text)
+
+def engineFailed(engine, game, color, game_log, metrics):
+    reason = engine.failure()
+    if reason:
+        engine_metrics = metrics[0] if color == chess.WHITE else metrics[1]
+        if reason == "stopped responding":
+            engine_metrics.hangs += 1
+        else:
+            engine_metrics.crashes += 1
+        for engine_metrics in metrics:
+            engine_metrics.games = 0
+        game.headers["Termination"] = "abandoned"
+        game.headers["Result"] = "0-1" if color == chess.WHITE else "1-0"
+        game.headers["PlyCount"] = str(len(list(game.mainline_moves())))
+        raise EngineFailure(game.headers["White" if color == chess.WHITE else "Black"], color, reason, game_log, metrics, str(game))
+
+def failedGame(error, retry):
+    if retry:
+        return None
+    if isinstance(error, EngineFailure):
+        result = "0-1" if error.color == chess.WHITE else "1-0"
+        for engine_metrics in error.metrics:
+            engine_metrics.games = 1
+        return f"{error.game_log}{error}; game forfeited.\n", result, error.pgn_text, error.metrics
+    return ERROR_OUTCOME
+
+def gameKey(game):
+    return f"Round {game.headers.get('Round', '?')}: {game.headers['White']} - {game.headers['Black']}"
+
+def simulate_game(pool, white_config, black_config, tc, observer=None, headers=None, adjudication=None, opening=None,
+                  capture="info", capture_path=None, cores=None):
+    board, game = newGame(white_config, black_config, headers, opening)
+    white_engine = pool.acquire(white_config, chess.WHITE)
+    black_engine = pool.acquire(black_config, chess.BLACK)
+    if cores:
+        pinProcess(white_engine.process, cores[0])
+        pinProcess(black_engine.process, cores[1])
+    try:
+        return play_game(board, game, white_engine, black_engine, white_config, black_config, tc, observer, adjudication, capture, capture_path)
+    finally:
+        pool.release(white_config, white_engine)
+        pool.release(black_config, black_engine)
+        if capture == "full" and capture_path:
+            captureWriter().finish(capture_path)
+        if observer:
+            observer.gameOver(gameKey(game))
+
+class GamePlay:
+    def __init__(self, board, game, white_engine, black_engine, tc, observer=None, adjudication=None, capture="info", capture_path=None):
+        self.board = board
+        self.game = game
+        self.white_engine = white_engine
+        self.black_engine = black_engine
+        self.tc = tc
+        self.observer = observer
+        self.capture = capture
+        self.capture_path = capture_path
+        self.node = game.end()
+        self.key = gameKey(game)
+        self.log = captureWriter() if capture == "full" and capture_path else None
+        if self.log:
+            self.log.write(capture_path, f"# {game.headers['White']} (White) vs. {game.headers['Black']} (Black)\n# {board.fen()}\n")
+            if observer:
+                observer.engineRaw(f"Engine output: {capture_path}")
+        if observer:
+            observer.boardUpdate(self.key, board.fen(), "")
+        self.metrics = gameMetrics(game.headers["White"], white_engine, game.headers["Black"], black_engine)
+        self.game_log = ""
+        self.move_count = 0
+        self.result = None
+        self.clock = GameClock(tc) if tc.usesClock() else None
+        self.adjudicator = Adjudicator(adjudication) if adjudication and adjudication.enabled() else None
+    def running(self):
+        return self.result is None and not self.board.is_game_over()
+    def request(self):
+        color = self.board.turn
+        engine = self.white_engine if color==chess.WHITE else self.black_engine
+        self.position = "position fen " + self.board.fen()
+        engine.sendCommand(self.position)
+        if self.clock:
+            self.go = self.clock.goCommand(color)
+            return engine, self.go, self.clock.timeoutMs(color)
+        self.go = f"go movetime {int(self.tc.movetime * 1000)}"
+        return engine, self.go, int(self.tc.movetime * 1000)
+    def played(self, bestmove, info_details, raw_output):
+        board, game, clock, observer = self.board, self.game, self.clock, self.observer
+        current_color = board.turn
+        current_engine = self.white_engine if current_color==chess.WHITE else self.black_engine
+        prefix = "White" if current_color==chess.WHITE else "Black"
+        engine_metrics = self.metrics[0] if current_color==chess.WHITE else self.metrics[1]
+        engine_metrics.move(current_engine.think_time, None if clock else self.tc.movetime, current_engine.last_info, bestmove is None)
+        if self.log:
+            self.log.write(self.capture_path, captureIO(prefix, self.position, self.go, raw_output))
+        elif observer and raw_output:
+            observer.engineRaw(f"{prefix} raw: {raw_output}")
+        if bestmove is None:
+            engineFailed(current_engine, game, current_color, self.game_log, self.metrics)
+        if (clock and not clock.punch(current_color, current_engine.think_time)) or bestmove is None:
+            self.game_log += f"{prefix} loses on time ({current_engine.think_time:.3f}s used).\n"
+            engine_metrics.time_losses += 1
+            self.result = timeForfeit(board, game, current_color)
+            return
+        move, error = parseBestmove(board, bestmove)
+        if error:
+            self.game_log += error
+            engine_metrics.illegal_moves += 1
+            self.result = illegalMove(game, current_color)
+            return
+        board.push(move)
+        self.node = self.node.add_variation(move)
+        annotateMove(self.node, current_engine.last_info, current_engine.think_time, current_color)
+        self.move_count += 1
+        if observer:
+            white_debug = f"White {game.headers['White']}: {info_details if info_details else 'idle'}"
+            black_debug = f"Black {game.headers['Black']}: {info_details if info_details else 'idle'}"
+            observer.engineInfo(white_debug, black_debug)
+            observer.boardUpdate(self.key, board.fen(), move.uci())
+        self.game_log += f"{self.move_count}. {prefix} plays {move.uci()} ({clock.status() if clock else self.tc})\n"
+        if self.adjudicator and not board.is_game_over():
+            adjudicated, reason = self.adjudicator.update(board, current_color, current_engine.last_score)
+            if adjudicated:
+                self.game_log += reason + "\n"
+                self.result = adjudicate(game, self.node, adjudicated, reason)
+    def outcome(self):
+        result = self.result
+        if result is None:
+            result = self.board.result() if self.board.is_game_over() else "Abort"
+        self.game.headers["Result"] = result if result != "Abort" else "*"
+        self.game.headers["PlyCount"] = str(len(self.board.move_stack))
+        return self.game_log, result, str(self.game), self.metrics
+
+def play_game(board, game, white_engine, black_engine, white_config, black_config, tc, observer=None, adjudication=None,
+              capture="info", capture_path=None):
+    play = GamePlay(board, game, white_engine, black_engine, tc, observer, adjudication, capture, capture_path)
+    while play.running():
+        engine, go, timeout_ms = play.request()
+        play.played(*engine.waitForBestmove(timeout_ms, go, play.capture))
+    return play.outcome()
+
+async def simulate_game_async(pool, white_config, black_config, tc, headers=None, adjudication=None, opening=None, capture_path=None,
+                              cores=None):
+    board, game = newGame(white_config, black_config, headers, opening)
+    white_engine, black_engine = await asyncio.gather(pool.acquire(white_config, chess.WHITE), pool.acquire(black_config, chess.BLACK))
+    if cores:
+        pinProcess(white_engine.process, cores[0])
+        pinProcess(black_engine.process, cores[1])
+    try:
+        return await play_game_async(board, game, white_engine, black_engine, tc, adjudication, capture_path)
+    finally:
+        await pool.release(white_config, white_engine)
+        await pool.release(black_config, black_engine)
+        if capture_path:
+            await asyncio.to_thread(captureWriter().finish, capture_path)
+
+async def play_game_async(board, game, white_engine, black_engine, tc, adjudication=None, capture_path=None):
+    play = GamePlay(board, game, white_engine, black_engine, tc, None, adjudication, "full" if capture_path else "off", capture_path)
+    while play.running():
+        engine, go, timeout_ms = play.request()
+        play.played(*await engine.go(command=go, timeout=timeout_ms/1000.0 + 2, capture=play.capture))
+    return play.outcome()
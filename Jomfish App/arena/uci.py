@@ -0,0 +1,388 @@
+import os, time, re, shlex, threading, queue, subprocess
+import chess
+
+MATE_SCORE = 100000
+PING_INTERVAL = 1.0
+PING_TIMEOUT = 2.0
+OPTION_KEYWORDS = ("name", "type", "default", "min", "max", "var")
+
+def commandArgs(command):
+    if os.path.exists(command):
+        return [command]
+    if os.name == "nt":
+        return [arg.strip('"') for arg in shlex.split(command, posix=False)]
+    return shlex.split(command)
+
+def startProcess(command, working_dir=""):
+    return subprocess.Popen(commandArgs(command), cwd=working_dir or None, stdin=subprocess.PIPE,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+
+class UCILineReader:
+    def __init__(self, stream):
+        self.lines = queue.Queue()
+        self.closed = False
+        self.stamp = 0.0
+        self.thread = threading.Thread(target=self.pump, args=(stream,), daemon=True)
+        self.thread.start()
+    def pump(self, stream):
+        for raw in iter(stream.readline, b""):
+            self.lines.put((time.perf_counter(), raw.decode(errors="replace").rstrip("\r\n")))
+        self.lines.put((time.perf_counter(), None))
+    def readLine(self, deadline):
+        if self.closed:
+            return None
+        try:
+            self.stamp, line = self.lines.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            return None
+        if line is None:
+            self.closed = True
+        return line
+
+class EngineInfo:
+    __slots__ = ("depth", "seldepth", "multipv", "cp", "mate", "bound", "nodes", "nps", "hashfull", "tbhits", "time",
+                 "wdl", "currmove", "currmovenumber", "pv")
+    INTEGER_FIELDS = frozenset(("depth", "seldepth", "multipv", "nodes", "nps", "hashfull", "tbhits", "time", "currmovenumber"))
+    SEARCH_FIELDS = frozenset(("depth", "seldepth", "nodes"))
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.pv = ()
+    def update(self, line):
+        tokens = line.split()
+        searched = "score" in tokens or "pv" in tokens
+        i = 1
+        try:
+            while i < len(tokens):
+                key = tokens[i]
+                if key in self.INTEGER_FIELDS and i+1 < len(tokens):
+                    if searched or key not in self.SEARCH_FIELDS:
+                        setattr(self, key, int(tokens[i+1]))
+                    i += 2
+                elif key == "score" and i+2 < len(tokens):
+                    value = int(tokens[i+2])
+                    self.cp, self.mate = (value, None) if tokens[i+1] == "cp" else (None, value)
+                    self.bound = None
+                    i += 3
+                    if i < len(tokens) and tokens[i] in ("lowerbound", "upperbound"):
+                        self.bound = tokens[i][:5]
+                        i += 1
+                elif key == "wdl" and i+3 < len(tokens):
+                    self.wdl = tuple(int(x) for x in tokens[i+1:i+4])
+                    i += 4
+                elif key == "currmove" and i+1 < len(tokens):
+                    self.currmove = tokens[i+1]
+                    i += 2
+                elif key == "pv":
+                    self.pv = tuple(tokens[i+1:])
+                    break
+                elif key == "string":
+                    break
+                else:
+                    i += 1
+        except ValueError:
+            pass
+        return self
+    def hasScore(self):
+        return self.cp is not None or self.mate is not None
+    def score(self):
+        if self.cp is not None:
+            return self.cp
+        if self.mate is None:
+            return None
+        return MATE_SCORE - self.mate if self.mate > 0 else -MATE_SCORE - self.mate
+    def scoreText(self):
+        text = f"{self.cp} cp" if self.cp is not None else f"mate {self.mate}"
+        return text + {"lower": " (lowerbound)", "upper": " (upperbound)"}.get(self.bound, "")
+    def format(self):
+        fields = [("Depth", self.depth), ("Seldepth", self.seldepth), ("MultiPV", self.multipv),
+                  ("Score", self.scoreText() if self.hasScore() else None), ("WDL", "/".join(map(str, self.wdl)) if self.wdl else None),
+                  ("Nodes", self.nodes), ("NPS", self.nps), ("Hashfull", self.hashfull), ("TBHits", self.tbhits),
+                  ("Time", f"{self.time}ms" if self.time is not None else None), ("PV", " ".join(self.pv[:8]) if self.pv else None)]
+        return " | ".join(f"{key}: {value}" for key, value in fields if value is not None)
+
+class BestmoveCollector:
+    def __init__(self, capture="full"):
+        self.capture = capture
+        self.raw_lines = []
+        self.infos = {}
+        self.latest_info = {}
+        self.bestmove = None
+        self.ponder = None
+        self.bestmove_line = ""
+        self.info_details = None
+        self.ready_seen = 0
+    def feed(self, line):
+        if self.capture == "full":
+            self.raw_lines.append(line)
+        if line.startswith("info") and not line.startswith("info string"):
+            m = re.search(r"\bmultipv (\d+)", line)
+            multipv = int(m.group(1)) if m else 1
+            if multipv not in self.infos:
+                self.infos[multipv] = EngineInfo()
+            self.infos[multipv].update(line)
+            if " score " in line:
+                self.latest_info[multipv] = line
+        elif line.startswith("bestmove"):
+            tokens = line.split()
+            self.bestmove = tokens[1] if len(tokens) > 1 else None
+            self.ponder = tokens[3] if len(tokens) > 3 and tokens[2] == "ponder" else None
+            self.bestmove_line = line
+            if self.infos:
+                self.info_details = self.info().format()
+            return True
+        elif line.strip() == "readyok":
+            self.ready_seen += 1
+        return False
+    def rawText(self):
+        if self.capture == "full":
+            return "\n".join(self.raw_lines)
+        if self.capture == "info" and self.latest_info:
+            return "\n".join([self.latest_info[k] for k in sorted(self.latest_info)] + [self.bestmove_line])
+        if self.capture == "off":
+            return ""
+        return self.bestmove_line
+    def result(self):
+        return self.bestmove, self.info_details, self.rawText()
+    def info(self):
+        return self.infos[min(self.infos)] if self.infos else None
+    def score(self):
+        info = self.info()
+        return info.score() if info else None
+
+class UCIEngineParser:
+    def __init__(self, command, working_dir=""):
+        self.command = command
+        self.working_dir = working_dir
+        self.process = None
+        self.options = []
+    def load_options(self, timeout=5000):
+        try:
+            self.process = startProcess(self.command, self.working_dir)
+        except OSError:
+            raise Exception("Engine could not be started.")
+        self.reader = UCILineReader(self.process.stdout)
+        self.sendCommand("uci")
+        deadline = time.monotonic() + timeout/1000.0
+        while True:
+            line = self.reader.readLine(deadline)
+            if line is None:
+                break
+            if line.startswith("option"):
+                self.parse_option_line(line)
+            elif line.strip() == "uciok":
+                break
+        self.process.kill()
+        self.process.wait()
+        return self.options
+    def sendCommand(self, cmd):
+        try:
+            self.process.stdin.write((cmd+"\n").encode())
+            self.process.stdin.flush()
+        except OSError:
+            pass
+    def parse_option_line(self, line):
+        fields, var, key = {}, [], None
+        for token in line.split()[1:]:
+            if token in OPTION_KEYWORDS and (key != "name" or token == "type"):
+                key = token
+                if key == "var":
+                    var.append([])
+                else:
+                    fields[key] = []
+            elif key == "var":
+                var[-1].append(token)
+            elif key:
+                fields[key].append(token)
+        if "name" not in fields or "type" not in fields:
+            return
+        value = lambda key: " ".join(fields.get(key, []))
+        opt = {"name": value("name"), "type": value("type"), "default": value("default"), "min": value("min"), "max": value("max"),
+               "var": [" ".join(v) for v in var], "value": value("default")}
+        if opt["name"] and not any(o["name"] == opt["name"] for o in self.options):
+            self.options.append(opt)
+
+class UCIEngine:
+    def __init__(self, command, working_dir="", use_wtime=False, time_left=1000, inc=0, color=chess.WHITE):
+        self.command = command
+        self.working_dir = working_dir
+        self.use_wtime = use_wtime
+        self.time_left = time_left
+        self.inc = inc
+        self.color = color
+        self.process = None
+        self.pending_ready = 0
+        self.think_time = 0.0
+        self.last_score = None
+        self.last_info = None
+        self.ponder_move = None
+        self.pondering = False
+        self.hung = False
+        self.startup_latency = None
+        self.startEngine()
+    def startEngine(self):
+        try:
+            self.process = startProcess(self.command, self.working_dir)
+        except OSError:
+            self.process = None
+            return
+        self.reader = UCILineReader(self.process.stdout)
+        self.started = time.perf_counter()
+        self.sendCommand("uci")
+        self.sendCommand("isready")
+        self.pending_ready += 1
+    def isRunning(self):
+        return self.process is not None and self.process.poll() is None
+    def failure(self):
+        if not self.isRunning() or self.reader.closed:
+            return "crashed"
+        if self.hung:
+            return "stopped responding"
+        return None
+    def sendCommand(self, cmd):
+        if self.isRunning():
+            try:
+                self.process.stdin.write((cmd+"\n").encode())
+                self.process.stdin.flush()
+            except OSError:
+                pass
+    def waitReady(self, timeout_ms=5000):
+        self.sendCommand("isready")
+        self.pending_ready += 1
+        deadline = time.monotonic() + timeout_ms/1000.0
+        while self.pending_ready > 0:
+            if not self.isRunning():
+                return False
+            line = self.reader.readLine(deadline)
+            if line is None:
+                return False
+            if line.strip() == "readyok":
+                self.pending_ready -= 1
+            elif line.strip() == "uciok" and self.startup_latency is None:
+                self.startup_latency = self.reader.stamp - self.started
+        return True
+    def newGame(self):
+        self.sendCommand("ucinewgame")
+        return self.waitReady()
+    def waitForBestmove(self, max_time_ms, go_command=None, capture="full"):
+        if not self.isRunning():
+            return None, None, ""
+        if go_command:
+            self.sendCommand(go_command)
+        elif self.use_wtime:
+            if self.color == chess.WHITE:
+                self.sendCommand(f"go wtime {int(self.time_left*1000)} winc {int(self.inc*1000)}")
+            else:
+                self.sendCommand(f"go btime {int(self.time_left*1000)} binc {int(self.inc*1000)}")
+        else:
+            self.sendCommand(f"go movetime {max_time_ms}")
+        return self.readBestmove(max_time_ms, capture)
+    def readBestmove(self, max_time_ms, capture="full"):
+        go_sent = time.perf_counter()
+        collector = BestmoveCollector(capture)
+        deadline = time.monotonic() + (max_time_ms/1000.0 + 2)
+        ping = None
+        while True:
+            line = self.reader.readLine(min(deadline, ping + PING_TIMEOUT if ping else time.monotonic() + PING_INTERVAL))
+            if line is not None:
+                ping = None
+                if collector.feed(line):
+                    break
+                continue
+            if self.reader.closed or time.monotonic() >= deadline:
+                break
+            if ping:
+                self.hung = True
+                break
+            self.sendCommand("isready")
+            self.pending_ready += 1
+            ping = time.monotonic()
+        self.pending_ready = max(0, self.pending_ready - collector.ready_seen)
+        self.think_time = (self.reader.stamp if collector.bestmove else time.perf_counter()) - go_sent
+        self.last_score = collector.score()
+        self.last_info = collector.info()
+        self.ponder_move = collector.ponder
+        if collector.bestmove is None:
+            self.sendCommand("stop")
+            self.drainBestmove()
+        return collector.result()
+    def drainBestmove(self):
+        if self.hung or self.reader.closed or not self.isRunning():
+            return
+        drain = BestmoveCollector("off")
+        deadline = time.monotonic() + PING_TIMEOUT
+        while True:
+            line = self.reader.readLine(deadline)
+            if line is None:
+                self.hung = not self.reader.closed
+                break
+            if drain.feed(line):
+                break
+        self.pending_ready = max(0, self.pending_ready - drain.ready_seen)
+    def ponder(self, fen, max_time_ms):
+        self.sendCommand("position fen " + fen)
+        self.sendCommand(f"go ponder movetime {max_time_ms}")
+        self.pondering = True
+    def ponderHit(self, max_time_ms, capture="full"):
+        self.pondering = False
+        if not self.isRunning():
+            return None, None, ""
+        self.sendCommand("ponderhit")
+        return self.readBestmove(max_time_ms, capture)
+    def stopPonder(self):
+        if self.pondering:
+            self.pondering = False
+            self.sendCommand("stop")
+            self.readBestmove(0, "off")
+    def quit(self):
+        if self.process is None:
+            return
+        self.sendCommand("quit")
+        try:
+            self.process.wait(0 if self.hung else 3)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+class EnginePool:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.idle = {}
+        self.lock = threading.Lock()
+    @staticmethod
+    def engineKey(config):
+        return (config["command"], config.get("workingDirectory", ""), tuple(config.get("initStrings", [])))
+    def spawn(self, config, color):
+        engine = UCIEngine(config["command"], config.get("workingDirectory", ""), False, 0, 0, color=color)
+        for cmd in config.get("initStrings", []):
+            engine.sendCommand(cmd)
+        return engine
+    def acquire(self, config, color):
+        key = self.engineKey(config)
+        with self.lock:
+            engines = self.idle.get(key)
+            engine = engines.pop() if engines else None
+        if engine is None:
+            engine = self.spawn(config, color)
+        engine.color = color
+        if not engine.isRunning() or not engine.newGame():
+            engine.quit()
+            engine = self.spawn(config, color)
+            engine.newGame()
+        return engine
+    def release(self, config, engine):
+        if not engine.failure():
+            with self.lock:
+                engines = self.idle.setdefault(self.engineKey(config), [])
+                if len(engines) < self.capacity:
+                    engines.append(engine)
+                    return
+        engine.quit()
+    def close(self):
+        with self.lock:
+            engines = [e for group in self.idle.values() for e in group]
+            self.idle = {}
+        for engine in engines:
+            engine.quit()
+
@@ -0,0 +1,172 @@
+import time, asyncio, subprocess
+import chess
+from uci import commandArgs, BestmoveCollector, EnginePool, PING_INTERVAL, PING_TIMEOUT
+
+class AsyncUCIEngine:
+    def __init__(self, command, working_dir="", color=chess.WHITE):
+        self.command = command
+        self.working_dir = working_dir
+        self.color = color
+        self.process = None
+        self.pending_ready = 0
+        self.think_time = 0.0
+        self.last_score = None
+        self.last_info = None
+        self.startup_latency = None
+        self.closed = False
+        self.hung = False
+        self.stamp = 0.0
+    async def start(self, timeout=5):
+        try:
+            self.process = await asyncio.create_subprocess_exec(*commandArgs(self.command), cwd=self.working_dir or None,
+                                                                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                                                stderr=subprocess.DEVNULL,
+                                                                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+        except OSError:
+            self.process = None
+            return False
+        self.started = time.perf_counter()
+        self.sendCommand("uci")
+        return await self.isready(timeout)
+    def isRunning(self):
+        return self.process is not None and self.process.returncode is None
+    def failure(self):
+        if not self.isRunning() or self.closed:
+            return "crashed"
+        if self.hung:
+            return "stopped responding"
+        return None
+    def sendCommand(self, cmd):
+        if self.isRunning():
+            try:
+                self.process.stdin.write((cmd+"\n").encode())
+            except OSError:
+                pass
+    async def readLine(self):
+        raw = await self.process.stdout.readline()
+        self.stamp = time.perf_counter()
+        if not raw:
+            self.closed = True
+            return None
+        return raw.decode(errors="replace").rstrip("\r\n")
+    async def drainReady(self):
+        while self.pending_ready > 0:
+            line = await self.readLine()
+            if line is None:
+                return
+            if line.strip() == "readyok":
+                self.pending_ready -= 1
+            elif line.strip() == "uciok" and self.startup_latency is None:
+                self.startup_latency = self.stamp - self.started
+    async def isready(self, timeout=5):
+        if not self.isRunning():
+            return False
+        self.sendCommand("isready")
+        self.pending_ready += 1
+        try:
+            await asyncio.wait_for(self.drainReady(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.pending_ready == 0
+    async def newGame(self):
+        self.sendCommand("ucinewgame")
+        return await self.isready()
+    async def go(self, movetime_ms=None, depth=None, nodes=None, timeout=None, command=None, capture="full"):
+        if not self.isRunning():
+            return None, None, ""
+        cmd = command or "go"
+        if movetime_ms is not None:
+            cmd += f" movetime {int(movetime_ms)}"
+        if depth is not None:
+            cmd += f" depth {int(depth)}"
+        if nodes is not None:
+            cmd += f" nodes {int(nodes)}"
+        self.sendCommand(cmd)
+        if timeout is None and movetime_ms is not None:
+            timeout = movetime_ms/1000.0 + 2
+        return await self.bestmove(timeout, capture)
+    async def collect(self, collector):
+        ping = False
+        while True:
+            try:
+                line = await asyncio.wait_for(self.readLine(), PING_TIMEOUT if ping else PING_INTERVAL)
+            except asyncio.TimeoutError:
+                if ping:
+                    self.hung = True
+                    return
+                self.sendCommand("isready")
+                self.pending_ready += 1
+                ping = True
+                continue
+            ping = False
+            if line is None or collector.feed(line):
+                return
+    async def bestmove(self, timeout=None, capture="full"):
+        collector = BestmoveCollector(capture)
+        go_sent = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.collect(collector), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.pending_ready = max(0, self.pending_ready - collector.ready_seen)
+        self.think_time = (self.stamp if collector.bestmove else time.perf_counter()) - go_sent
+        self.last_score = collector.score()
+        self.last_info = collector.info()
+        if collector.bestmove is None:
+            self.sendCommand("stop")
+            await self.drainBestmove()
+        return collector.result()
+    async def drain(self, collector):
+        while True:
+            line = await self.readLine()
+            if line is None or collector.feed(line):
+                return
+    async def drainBestmove(self):
+        if self.hung or self.closed or not self.isRunning():
+            return
+        drain = BestmoveCollector("off")
+        try:
+            await asyncio.wait_for(self.drain(drain), PING_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.hung = True
+        self.pending_ready = max(0, self.pending_ready - drain.ready_seen)
+    async def quit(self):
+        if self.process is None:
+            return
+        self.sendCommand("quit")
+        try:
+            await asyncio.wait_for(self.process.wait(), 0 if self.hung else 3)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+
+class AsyncEnginePool:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.idle = {}
+    async def spawn(self, config, color):
+        engine = AsyncUCIEngine(config["command"], config.get("workingDirectory", ""), color=color)
+        await engine.start()
+        for cmd in config.get("initStrings", []):
+            engine.sendCommand(cmd)
+        return engine
+    async def acquire(self, config, color):
+        engines = self.idle.get(EnginePool.engineKey(config))
+        engine = engines.pop() if engines else await self.spawn(config, color)
+        engine.color = color
+        if not engine.isRunning() or not await engine.newGame():
+            await engine.quit()
+            engine = await self.spawn(config, color)
+            await engine.newGame()
+        return engine
+    async def release(self, config, engine):
+        if not engine.failure():
+            engines = self.idle.setdefault(EnginePool.engineKey(config), [])
+            if len(engines) < self.capacity:
+                engines.append(engine)
+                return
+        await engine.quit()
+    async def close(self):
+        engines = [e for group in self.idle.values() for e in group]
+        self.idle = {}
+        await asyncio.gather(*(engine.quit() for engine in engines))